@@ -8,6 +8,7 @@ import re
 import os
 import subprocess
 from pathlib import Path
+from source_reader import read_source
 
 try:
     from graphviz import Digraph
@@ -244,8 +245,7 @@ class ActivityDiagramGenerator:
                 return False
                 
             # Read file content
-            with open(c_file_path, 'r', encoding='utf-8') as f:
-                c_code = f.read()
+            c_code = read_source(c_file_path)
             
             print("Preprocessing C code for activity diagram generation...")
             # Preprocess the code
@@ -0,0 +1,126 @@
+"""
+Parse Cache for Documentation Slayer
+Content-addressed SQLite store of parse results, so unchanged files are not parsed again
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+
+CACHE_FILE = "parse_cache.sqlite"
+DEFAULT_MAX_MB = 512
+READ_BLOCK = 1 << 20
+
+
+def file_digest(path) -> str:
+    """SHA-256 of the bytes of the file at path."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(READ_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """
+    Parse results in one SQLite file under cache_dir, keyed by a digest of the file's bytes,
+    the parser version and the parse options, so an entry can only ever be found for the
+    exact input it was made from. Results are stored as compressed JSON; past max_mb the
+    least recently used entries are evicted. A cache that cannot be read or written only
+    costs the lookups: get() misses and put() stores nothing.
+    """
+
+    def __init__(self, cache_dir, version: str, max_mb: float = DEFAULT_MAX_MB):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, CACHE_FILE)
+        self.version = version
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = self.misses = self.stores = self.evictions = 0
+
+        self.db = sqlite3.connect(self.path, timeout=30)
+        # WAL: readers do not block the writer, and commits skip the fsync
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, data BLOB NOT NULL, "
+                        "size INTEGER NOT NULL, last_used REAL NOT NULL)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self.db.commit()
+        self.size = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        self.evict()  # the cap may be lower than last time
+        self.db.commit()
+
+    def key(self, path, options: dict) -> str:
+        """Cache key of the file at path parsed with options (JSON-serializable)."""
+        digest = hashlib.sha256(file_digest(path).encode())
+        digest.update(b"\0" + self.version.encode())
+        digest.update(b"\0" + json.dumps(options, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str):
+        """The payload stored under key, or None."""
+        try:
+            row = self.db.execute("SELECT data FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self.db.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+                self.db.commit()
+                payload = json.loads(zlib.decompress(row[0]))
+                self.hits += 1
+                return payload
+        except (sqlite3.Error, zlib.error, ValueError):
+            pass
+        self.misses += 1
+        return None
+
+    def put(self, key: str, payload):
+        """Store payload (JSON-serializable) under key, then evict down to the size cap."""
+        data = zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+        try:
+            row = self.db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self.db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                            (key, data, len(data), time.time()))
+            self.size += len(data) - (row[0] if row else 0)
+            self.stores += 1
+            self.evict()
+            self.db.commit()
+        except sqlite3.Error:
+            self.db.rollback()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        while self.size > self.max_bytes:
+            rows = self.db.execute("SELECT key, size FROM entries ORDER BY last_used LIMIT 64").fetchall()
+            if not rows:
+                self.size = 0
+                break
+            for key, size in rows:
+                if self.size <= self.max_bytes:
+                    break
+                self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.size -= size
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        """Lookups of this run, plus the entries and lifetime lookups of the whole cache."""
+        counters = dict(self.db.execute("SELECT name, value FROM counters"))
+        entries = self.db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {
+            "hits": self.hits, "misses": self.misses, "stores": self.stores, "evictions": self.evictions,
+            "entries": entries, "size": self.size, "max_size": self.max_bytes,
+            "lifetime_hits": counters.get("hits", 0) + self.hits,
+            "lifetime_misses": counters.get("misses", 0) + self.misses,
+        }
+
+    def close(self):
+        """Add this run's lookups to the lifetime counters and close the database."""
+        try:
+            self.db.executemany("INSERT INTO counters VALUES (?, ?) "
+                                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                                [("hits", self.hits), ("misses", self.misses)])
+            self.db.commit()
+        except sqlite3.Error:
+            pass
+        self.db.close()
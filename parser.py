@@ -5,6 +5,7 @@ import sys
 import argparse
 import os
 import platform
+import hashlib
 from pathlib import Path
 from docx import Document
 from docx.oxml import OxmlElement
@@ -13,6 +14,18 @@ from openpyxl import Workbook, load_workbook
 from openpyxl.styles import Font, PatternFill
 import subprocess
 import threading
+import time
+import heapq
+import multiprocessing
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import chain, islice
+from collections.abc import Mapping
+from operator import attrgetter
+from source_reader import decode_source, read_source
+from parse_cache import DEFAULT_MAX_MB, ParseCache, file_digest
+from preprocessor import (MacroEvaluator, MacroResolver, build_defines, directive_line_code, iter_defines,
+                          match_define, strip_directive_comments)
 
 # PyQt6 imports
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
@@ -39,22 +52,67 @@ pyinstaller --onefile --windowed --name "Doc-Slayer" --icon "DocSlayerLogo.ico"
 
 # Global cancellation flag
 class CancellationToken:
-    """Thread-safe cancellation token for long-running operations"""
+    """
+    Cancellation token for long-running operations, shared between threads.
+    A bool attribute is read and written atomically, so polling it takes no lock.
+    """
     def __init__(self):
         self.cancelled = False
-        self._lock = threading.Lock()
 
     def cancel(self):
-        with self._lock:
-            self.cancelled = True
+        self.cancelled = True
 
     def is_cancelled(self):
-        with self._lock:
-            return self.cancelled
+        return self.cancelled
 
     def reset(self):
-        with self._lock:
-            self.cancelled = False
+        self.cancelled = False
+
+
+class DeadlineToken(CancellationToken):
+    """Cancellation token that also trips once budget seconds have passed, or when parent does"""
+    def __init__(self, budget, parent=None):
+        super().__init__()
+        self.deadline = time.monotonic() + budget
+        self.parent = parent
+
+    def expired(self):
+        return time.monotonic() >= self.deadline
+
+    def is_cancelled(self):
+        if self.parent is not None and self.parent.is_cancelled():
+            return True
+        return self.expired() or super().is_cancelled()
+
+
+class ParseCancelled(Exception):
+    """Raised at a cancellation checkpoint to unwind a parse; parse_file returns what it has so far"""
+
+
+# Items between two cancellation checkpoints: a few milliseconds of work in the slowest loop
+CHECK_EVERY = 2048
+
+
+def checkpoints(iterable, cancel_token):
+    """
+    iterable with a cancellation checkpoint every CHECK_EVERY items, raising ParseCancelled
+    once cancel_token is cancelled. Items are handed on in blocks through itertools,
+    so the loop consuming them pays nothing per item.
+    """
+    if cancel_token is None:
+        return iter(iterable)
+    it = iter(iterable)
+
+    def blocks():
+        while True:
+            if cancel_token.is_cancelled():
+                raise ParseCancelled()
+            block = list(islice(it, CHECK_EVERY))
+            if not block:
+                return
+            yield block
+
+    return chain.from_iterable(blocks())
 
 
 class ParserThread(QThread):
@@ -62,22 +120,27 @@ class ParserThread(QThread):
     finished = pyqtSignal(bool, str, list, list, list)  # success, error, functions, macros, variables
     progress = pyqtSignal(str)  # progress text
 
-    def __init__(self, file_path, cancel_token):
+    def __init__(self, file_path, cancel_token, fields=None, resolve=False):
         super().__init__()
         self.file_path = file_path
         self.cancel_token = cancel_token
+        self.fields = fields  # function fields to compute (None = all)
+        self.resolve = resolve  # add resolved macro values
 
     def run(self):
         try:
             self.progress.emit("Reading file...")
-            with open(self.file_path, encoding="utf-8") as f:
-                src = f.read()
+            src = read_source(self.file_path)
 
             self.progress.emit(f"Parsing file ({len(src):,} bytes)...")
-            functions, macros, variables = parse_file(src, self.cancel_token)
+            functions, macros, variables = incremental_parser(self.file_path).parse(
+                src, self.cancel_token, self.fields)
+            if self.resolve:
+                macros = resolve_macros(macros)
 
             if self.cancel_token.is_cancelled():
-                self.finished.emit(False, "Operation cancelled", [], [], [])
+                # whatever was extracted before the cancel came in
+                self.finished.emit(False, "Operation cancelled", functions, macros, variables)
                 return
 
             self.finished.emit(True, "", functions, macros, variables)
@@ -200,7 +263,7 @@ def write_excel(file_path: str, functions: list[dict], macros: list[dict], varia
     ]
 
     MACRO_HEADERS = [
-        'Line Number', 'Name', 'Value'
+        'Line Number', 'Name', 'Value', 'Resolved Value'
     ]
 
     VARIABLE_HEADERS = [
@@ -294,6 +357,8 @@ def write_excel(file_path: str, functions: list[dict], macros: list[dict], varia
                     row.append(r['name'])
                 elif h == 'Value':
                     row.append(r['value'])
+                elif h == 'Resolved Value':
+                    row.append(r.get('resolved', ''))
             ws_macros.append(row)
 
         # Auto-adjust column widths
@@ -369,6 +434,7 @@ def write_markdown(file_path: str, functions: list[dict], macros: list[dict], va
         'Line Number': lambda r: str(r.get('lineNumber', '')),
         'Name':  lambda r: r['name'],
         'Value': lambda r: f"`{r['value']}`",
+        'Resolved Value': lambda r: f"`{r['resolved']}`" if r.get('resolved') else "",
     }
 
     VARIABLE_FIELD_GETTERS = {
@@ -518,6 +584,8 @@ def write_docx(source_path: str, swcName: str, functions: list[dict], macros: li
                 add_row("Macro Name", r['name'])
             if 'Value' in sel_macro_fields:
                 add_row("Value", r['value'])
+            if 'Resolved Value' in sel_macro_fields:
+                add_row("Resolved Value", r.get('resolved', ''))
 
             doc.add_page_break()
 
@@ -553,123 +621,655 @@ def write_docx(source_path: str, swcName: str, functions: list[dict], macros: li
     docx_path = excel_path.with_suffix('.docx')
     doc.save(str(docx_path))
 
-def classify_params(body: str, params: list[str], param_types: list[str]) -> dict:
+# Token kinds produced by CTokenStream (values double as regex group indices)
+T_COMMENT = 1
+T_PREPROC = 2
+T_STRING  = 3
+T_CHAR    = 4
+T_IDENT   = 5
+T_NUMBER  = 6
+T_PUNCT   = 7
+
+# Single master pattern: every alternative is one token kind, whitespace is skipped
+C_TOKEN_RX = re.compile(r'''
+    (/\*[\s\S]*?(?:\*/|\Z)|//[^\n]*)                            # 1 comment
+  | (^[ \t]*\#(?://(?:\\\r?\n|[^\n])*|/\*[\s\S]*?\*/              # 2 preprocessor line (with comments,
+               |"(?:\\[\s\S]|[^"\\\n])*"?|'(?:\\[\s\S]|[^'\\\n])*'?     #   literals and continuations)
+               |\\\r?\n|[^\n])*)
+  | ("(?:\\[\s\S]|[^"\\\n])*"?)                                  # 3 string literal
+  | ('(?:\\[\s\S]|[^'\\\n])*'?)                                  # 4 char literal
+  | ([A-Za-z_]\w*)                                               # 5 identifier / keyword
+  | (\.?\d(?:[eEpP][+-]|[\w.])*)                                 # 6 number
+  | (->|\+\+|--|<<=?|>>=?|&&|\|\||[<>=!&|^+\-*/%]=|\#\#|\.\.\.|[^\s\w])  # 7 punctuation
+    ''', re.MULTILINE | re.VERBOSE)
+
+
+# Everything but line breaks, used to blank out comments and directives in place
+BLANK_RX = re.compile(r"[^\n]")
+
+# Runnable trigger lines inside RTE-generated banner comments
+TRIGGER_RX = re.compile(r"-\s*triggered\s+(?:on|by)\s+([^\n\r]+)", re.IGNORECASE)
+
+
+class CTokenStream:
+    """
+    Flat token stream built by a single lexer pass over C source.
+    Tokens are stored as parallel compact arrays (kind, start, end) of offsets into src.
+    """
+    __slots__ = ("src", "kinds", "starts", "ends", "cancel_token", "_code", "_partners")
+
+    def __init__(self, src: str, cancel_token: CancellationToken = None):
+        self.src = src
+        self.cancel_token = cancel_token  # polled by every pass over the tokens
+        self.kinds = bytearray()
+        self.starts = array('l')
+        self.ends = array('l')
+        self._code = None
+        self._partners = None
+
+        add_kind = self.kinds.append
+        add_start = self.starts.append
+        add_end = self.ends.append
+        for m in checkpoints(C_TOKEN_RX.finditer(src), cancel_token):
+            add_kind(m.lastindex)
+            start, end = m.span()
+            add_start(start)
+            add_end(end)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def text(self, i: int) -> str:
+        return self.src[self.starts[i]:self.ends[i]]
+
+    def indices(self, start: int = 0, stop: int = None):
+        """range(start, stop) over token indices, with cancellation checkpoints."""
+        return checkpoints(range(start, len(self.kinds) if stop is None else stop), self.cancel_token)
+
+    def code(self) -> array:
+        """Indices of the tokens that are real code (no comments, no preprocessor lines)."""
+        if self._code is None:
+            kinds = self.kinds
+            self._code = array('l', (i for i in self.indices() if kinds[i] > T_PREPROC))
+        return self._code
+
+    def partners(self) -> array:
+        """
+        Bracket matching table: for every (, [, { token the index of its closing
+        partner and vice versa; -1 for other tokens and unbalanced brackets.
+        Brackets inside comments, strings and preprocessor lines never count.
+        """
+        if self._partners is None:
+            src, kinds, starts = self.src, self.kinds, self.starts
+            partners = array('l', [-1]) * len(kinds)
+            stacks = {"(": [], "[": [], "{": []}
+            closers = {")": stacks["("], "]": stacks["["], "}": stacks["{"]}
+            for i in self.indices():
+                if kinds[i] != T_PUNCT:
+                    continue
+                c = src[starts[i]]
+                if c in stacks:
+                    stacks[c].append(i)
+                elif c in closers and closers[c]:
+                    j = closers[c].pop()
+                    partners[i], partners[j] = j, i
+            self._partners = partners
+        return self._partners
+
+    def index_at(self, pos: int) -> int:
+        """Index of the token starting exactly at offset pos, or -1."""
+        i = bisect_right(self.starts, pos) - 1
+        return i if i >= 0 and self.starts[i] == pos else -1
+
+    def match_end(self, pos: int) -> int:
+        """End offset of the bracket matching the one at offset pos, or -1."""
+        i = self.index_at(pos)
+        j = self.partners()[i] if i >= 0 else -1
+        return self.ends[j] if j >= 0 else -1
+
+    def comments(self) -> list:
+        """Block comments as (end, text) pairs in source order."""
+        src, starts, ends = self.src, self.starts, self.ends
+        kinds = self.kinds
+        return [(ends[i], src[starts[i]:ends[i]])
+                for i in self.indices()
+                if kinds[i] == T_COMMENT and src.startswith("/*", starts[i])]
+
+    def preprocessor_lines(self):
+        """Yield (start, text) for every preprocessor line token."""
+        src, kinds, starts, ends = self.src, self.kinds, self.starts, self.ends
+        for i in self.indices():
+            if kinds[i] == T_PREPROC:
+                yield starts[i], src[starts[i]:ends[i]]
+
+    def code_text(self, start: int = 0, end: int = None) -> str:
+        """Source (or the [start, end) slice of it) with comments and preprocessor lines removed."""
+        src, kinds, starts, ends = self.src, self.kinds, self.starts, self.ends
+        if end is None:
+            end = len(src)
+        parts, last = [], start
+        for i in range(bisect_right(ends, start), bisect_left(starts, end)):
+            if kinds[i] <= T_PREPROC:
+                parts.append(src[last:max(starts[i], last)])
+                last = min(ends[i], end)
+        parts.append(src[last:end])
+        return "".join(parts)
+
+    def blanked_text(self) -> str:
+        """
+        Source with comments and preprocessor lines overwritten by blanks.
+        Newlines are kept, so every offset and line number still matches src.
+        """
+        src, kinds, starts, ends = self.src, self.kinds, self.starts, self.ends
+        parts, last = [], 0
+        for i in self.indices():
+            if kinds[i] <= T_PREPROC:
+                parts.append(src[last:starts[i]])
+                parts.append(BLANK_RX.sub(" ", src[starts[i]:ends[i]]))
+                last = ends[i]
+        parts.append(src[last:])
+        return "".join(parts)
+
+
+class LineIndex:
+    """
+    Line-start offset table built once per file.
+    Offsets are turned into 1-indexed line numbers with a binary search.
+    """
+    __slots__ = ("src", "starts")
+
+    def __init__(self, src: str, cancel_token: CancellationToken = None):
+        self.src = src
+        self.starts = array('l', [0])
+        self.starts.extend(m.end() for m in checkpoints(re.finditer('\n', src), cancel_token))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def line_of(self, pos: int) -> int:
+        """Line number (1-indexed) holding offset pos."""
+        return bisect_right(self.starts, pos)
+
+    def text(self, i: int, limit: int = None) -> str:
+        """Text of 0-indexed line i without its newline, cut at offset limit if given."""
+        start = self.starts[i]
+        end = self.starts[i + 1] - 1 if i + 1 < len(self.starts) else len(self.src)
+        if limit is not None and limit < end:
+            end = limit
+        return self.src[start:end]
+
+
+class CommentIndex:
+    """
+    Block comments ordered by end offset, tagged once as trigger, Doxygen or
+    AUTOSAR-generated so "nearest qualifying comment before pos" is a bisect.
+    """
+    TRIGGER = 1
+    DOXYGEN = 2
+    AUTOSAR = 4
+
+    __slots__ = ("comments", "tags", "tokens", "_ends", "_members")
+
+    def __init__(self, comments: list, tokens: CTokenStream = None):
+        self.comments = sorted(comments, key=lambda c: c[0])
+        self.tokens = tokens
+        self.tags = bytearray()
+        for end, txt in checkpoints(self.comments, tokens.cancel_token if tokens else None):
+            tag = 0
+            if TRIGGER_RX.search(txt):
+                tag |= self.TRIGGER
+            head = txt.strip()
+            if head.startswith('/**') or head.startswith('/*!'):
+                tag |= self.DOXYGEN
+            if "DO NOT CHANGE THIS COMMENT!" in txt:
+                tag |= self.AUTOSAR
+            self.tags.append(tag)
+
+        # Per-lookup member lists; AUTOSAR banners never count as Doxygen blocks
+        self._ends, self._members = {}, {}
+        for tag, skip in ((self.TRIGGER, 0), (self.DOXYGEN, self.AUTOSAR)):
+            members = [i for i, t in enumerate(self.tags) if t & tag and not t & skip]
+            self._members[tag] = members
+            self._ends[tag] = array('l', (self.comments[i][0] for i in members))
+
+    def iter_before(self, pos: int, tag: int):
+        """Yield (end, text) of comments with the given tag ending at or before pos, nearest first."""
+        members = self._members[tag]
+        for k in range(bisect_right(self._ends[tag], pos) - 1, -1, -1):
+            yield self.comments[members[k]]
+
+    def nearest(self, pos: int, tag: int) -> str:
+        """Text of the closest comment with the given tag ending at or before pos."""
+        for end, txt in self.iter_before(pos, tag):
+            return txt
+        return ""
+
+    def code_end_before(self, pos: int):
+        """End offset of the last code token before pos (None without a token stream)."""
+        if self.tokens is None:
+            return None
+        kinds, ends = self.tokens.kinds, self.tokens.ends
+        j = bisect_right(ends, pos) - 1
+        while j >= 0 and kinds[j] == T_COMMENT:
+            j -= 1
+        return ends[j] if j >= 0 else 0
+
+
+class SpanIndex:
+    """
+    Sorted, non-overlapping set of inclusive [start, end] offset spans.
+    Overlapping and nested spans are merged on construction; containment is a bisect.
+    """
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, spans=()):
+        self.starts = array('l')
+        self.ends = array('l')
+        for start, end in sorted(spans):
+            if self.ends and start <= self.ends[-1]:
+                if end > self.ends[-1]:
+                    self.ends[-1] = end
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __contains__(self, pos: int) -> bool:
+        k = bisect_right(self.starts, pos) - 1
+        return k >= 0 and pos <= self.ends[k]
+
+    def gaps(self, end: int):
+        """Yield (start, stop) for each stretch of [0, end) outside every span, in order."""
+        pos = 0
+        for start, span_end in zip(self.starts, self.ends):
+            if start > pos:
+                yield pos, start
+            pos = max(pos, span_end + 1)
+        if pos < end:
+            yield pos, end
+
+
+def head_line_start(src: str, pos: int) -> int:
+    """Offset of the line holding pos if only blanks precede pos on it, else -1."""
+    line_start = src.rfind("\n", 0, pos) + 1
+    return -1 if src[line_start:pos].strip(" \t") else line_start
+
+
+def find_function_heads(ts: CTokenStream) -> tuple[list, list, list]:
+    """
+    Find every function head in one walk over the token stream.
+    Returns (runnables, statics, globals); each head is (start, retType, name, paren)
+    where start is the offset of the head's line and paren is the token index of the opening '('.
+    """
+    src, kinds, starts, ends = ts.src, ts.kinds, ts.starts, ts.ends
+    code = ts.code()
+    control_kw = {"if", "for", "while", "switch", "do", "else", "case"}
+    runnables, statics, globals_ = [], [], []
+
+    def tok(k):
+        """Text of the k-th code token (empty if out of range)."""
+        if k < 0:
+            return ""
+        i = code[k]
+        return src[starts[i]:ends[i]]
+
+    def is_ident(k):
+        return k >= 0 and kinds[code[k]] == T_IDENT
+
+    def is_func_macro(k):
+        """FUNC ( ID , ID ) ending at code index k."""
+        return (tok(k) == ")" and is_ident(k - 1) and tok(k - 2) == "," and is_ident(k - 3)
+                and tok(k - 4) == "(" and tok(k - 5) == "FUNC")
+
+    for k in checkpoints(range(1, len(code)), ts.cancel_token):
+        i = code[k]
+        if kinds[i] != T_PUNCT or src[starts[i]] != "(" or not is_ident(k - 1):
+            continue
+        name = tok(k - 1)
+
+        # Runnable: FUNC(ret, memclass) name(
+        if is_func_macro(k - 2):
+            line_start = head_line_start(src, starts[code[k - 7]])
+            if line_start >= 0:
+                runnables.append((line_start, tok(k - 5), name, i))
+
+        # Static: static [inline] (FUNC(ret, memclass) | ret) name(
+        if is_func_macro(k - 2):
+            ret_k, first = k - 5, k - 8
+        else:
+            ret_k, first = k - 2, k - 3
+        if is_ident(ret_k) and first >= 0:
+            if tok(first) == "inline" and tok(first - 1) == "static":
+                first -= 1
+            line_start = head_line_start(src, starts[code[first]]) if tok(first) == "static" else -1
+            if line_start >= 0:
+                statics.append((line_start, tok(ret_k), name, i))
+
+        # Global: ret[*] name(  (not static, not FUNC, name not a control keyword)
+        if name in control_kw:
+            continue
+        k_type = k - 2
+        while k_type >= 0 and tok(k_type) == "*" and kinds[code[k_type]] == T_PUNCT:
+            k_type -= 1
+        if k_type < k - 2:
+            # Stars must be contiguous and followed by whitespace ("uint8* name")
+            last_star = code[k - 2]
+            if not src[ends[last_star]:ends[last_star] + 1].isspace():
+                continue
+            if any(ends[code[s]] != starts[code[s + 1]] for s in range(k_type + 1, k - 2)):
+                continue
+        if not is_ident(k_type) or tok(k_type) in ("static", "FUNC"):
+            continue
+        head = code[k_type]
+        line_start = head_line_start(src, starts[head])
+        if line_start >= 0:
+            globals_.append((line_start, src[starts[head]:ends[code[k - 2]]], name, i))
+
+    return runnables, statics, globals_
+
+class ParseContext:
+    """
+    Per-file analysis state built once and shared by every extractor of a parse:
+    token stream, line index, comment index and the discovered function definitions.
+    leading_trigger is the trigger comment in force where src starts, for chunks of a larger file.
+    cancel_token (kept on the token stream) is polled by every stage working on the context.
+    """
+
+    def __init__(self, src: str, leading_trigger: str = "", cancel_token: CancellationToken = None):
+        self.src = src
+        self.leading_trigger = leading_trigger
+        self.tokens = CTokenStream(src, cancel_token)
+        self.lines = LineIndex(src, cancel_token)
+        self._comments = None
+        self._functions = None
+        self._function_bodies = None
+
+    @property
+    def comments(self) -> CommentIndex:
+        """Block comment index, built on first use (only function descriptions and triggers need it)."""
+        if self._comments is None:
+            self._comments = CommentIndex(self.tokens.comments(), self.tokens)
+        return self._comments
+
+    def functions(self) -> list:
+        """
+        Function definitions in extraction order (runnables, statics, globals) as
+        (fnType, start, retType, name, paren, close, brace, brace_end) tuples, where
+        paren/close and brace/brace_end are token indices (brace_end is -1 if never closed).
+        Prototypes and heads whose parameter list never closes are dropped.
+        """
+        if self._functions is None:
+            src, kinds, starts = self.src, self.tokens.kinds, self.tokens.starts
+            partners = self.tokens.partners()
+            n = len(kinds)
+            functions = []
+            runnables, statics, globals_ = find_function_heads(self.tokens)
+            for fnType, heads in (("Runnable", runnables), ("Static", statics), ("Global", globals_)):
+                for start, retType, name, paren in heads:
+                    close = partners[paren]
+                    if close < 0:
+                        continue
+
+                    # skip prototypes: only comments may sit between ')' and '{'
+                    k = close + 1
+                    while k < n and kinds[k] == T_COMMENT:
+                        k += 1
+                    if k >= n or kinds[k] != T_PUNCT or src[starts[k]] != "{":
+                        continue
+
+                    functions.append((fnType, start, retType, name, paren, close, k, partners[k]))
+            self._functions = functions
+        return self._functions
+
+    def function_bodies(self) -> SpanIndex:
+        """Spans of every closed function body, from its '{' to just past its '}'."""
+        if self._function_bodies is None:
+            starts, ends = self.tokens.starts, self.tokens.ends
+            self._function_bodies = SpanIndex(
+                (starts[fn[6]], ends[fn[7]]) for fn in self.functions() if fn[7] >= 0)
+        return self._function_bodies
+
+
+# Call names used by the IN/OUT classification (patterns 7, 12 and 14 below)
+PARAM_DEST_FUNCS = {"memcpy", "strcpy", "sprintf", "snprintf"}
+PARAM_SRC_FUNCS = {"memcpy", "strcpy", "strcmp", "strncmp"}
+PARAM_COND_KEYWORDS = ("if", "while", "for", "switch")
+PARAM_EXPR_OPS = frozenset("+-*/%&|^<>")
+PARAM_WORD_KINDS = (T_IDENT, T_NUMBER)
+
+
+def classify_params(body: str, params: list[str], param_types: list[str],
+                    tokens: CTokenStream = None, first: int = 0, last: int = None) -> dict:
     """
     Precise IN/OUT/INOUT detection for parameters.
     Analyzes pointer usage patterns within the function body.
+
+    The body's code tokens are walked once and the read/write state of every
+    parameter is updated together. Pass the file's token stream and the token
+    range of the body (exclusive bounds) to avoid re-lexing; body is then unused.
     """
     result = {}
+    WRITTEN, READ = 1, 2
+    state = {}
 
     for p, ptype in zip(params, param_types):
-        esc = re.escape(p)
-
         # Check if parameter has const qualifier
         if re.search(r'\bconst\b', ptype):
             result[p] = "IN"
-            continue
+        else:
+            result[p] = None
+            state[p] = 0
+
+    if state:
+        if tokens is None:
+            tokens, first, last = CTokenStream(body), -1, None
+        src, kinds, starts, ends = tokens.src, tokens.kinds, tokens.starts, tokens.ends
+        code = tokens.code()
+        lo = bisect_right(code, first)
+        hi = bisect_left(code, last) if last is not None else len(code)
+        idx = code[lo:hi]
+        toks = [src[starts[i]:ends[i]] for i in checkpoints(idx, tokens.cancel_token)]
+        kind = [kinds[i] for i in checkpoints(idx, tokens.cancel_token)]
+        n = len(toks)
+        toks.extend(("", "", ""))  # padding for look-ahead
+        kind.extend((0, 0, 0))
+
+        # Next occurrence of a punctuator at or after a position; the search starts
+        # only move forward, so every pointer crosses the body at most once
+        found = {}
+
+        def next_tok(t, start):
+            k = found.get(t, -1)
+            if k < start:
+                k = start
+                while k < n and toks[k] != t:
+                    k += 1
+                found[t] = k
+            return k
+
+        write_until = read_until = cond_until = -1
+
+        for k in checkpoints(range(n), tokens.cancel_token):
+            tk = toks[k]
+            if kind[k] != T_IDENT:
+                continue
+
+            if toks[k + 1] == "(":
+                # Pattern 8: Write APIs - functions with Write/Set in name (arguments up to the next ';')
+                if "Write" in tk or "Set" in tk:
+                    write_until = max(write_until, next_tok(";", k + 2))
+                # Pattern 13: Read APIs - functions with Read/Get in name (arguments up to the next ';')
+                if "Read" in tk or "Get" in tk:
+                    read_until = max(read_until, next_tok(";", k + 2))
+                # Pattern 14: Parameter used in comparison or condition (up to the first ')')
+                # The keyword may end a longer name, exactly as the original pattern allowed
+                if tk.endswith(PARAM_COND_KEYWORDS):
+                    cond_until = max(cond_until, next_tok(")", k + 2))
+                # Pattern 7: Function calls with param as destination (first parameter typically)
+                # memcpy(dest, src, len) - dest is OUT
+                if tk in PARAM_DEST_FUNCS and toks[k + 2] in state and toks[k + 3] == ",":
+                    state[toks[k + 2]] |= WRITTEN
+                # Pattern 12: Function calls with param as source (second parameter typically)
+                # memcpy(dest, src, len) - src is IN
+                if tk in PARAM_SRC_FUNCS:
+                    c = next_tok(",", k + 2)
+                    if c > k + 2 and toks[c + 1] in state and toks[c + 2] in (",", ")"):
+                        state[toks[c + 1]] |= READ
+
+            if tk not in state:
+                continue
+
+            prev, prev2, prev3 = toks[k - 1] if k else "", toks[k - 2] if k > 1 else "", toks[k - 3] if k > 2 else ""
+            nxt, nxt2, nxt3 = toks[k + 1], toks[k + 2], toks[k + 3]
+            bits = 0
+
+            # === WRITE PATTERNS ===
+
+            # Pattern 1: Pointer dereference writes - *param = value
+            if prev == "*" and nxt[:1] == "=":
+                bits |= WRITTEN
+
+            # Pattern 2: Array access writes - param[i] = value
+            if nxt == "[":
+                j = next_tok("]", k + 2)
+                if k + 2 < j < n and toks[j + 1][:1] == "=":
+                    bits |= WRITTEN
+
+            # Pattern 3: Structure member writes - param->field = value
+            if nxt == "->" and kind[k + 2] in PARAM_WORD_KINDS and nxt3[:1] == "=":
+                bits |= WRITTEN
+
+            # Pattern 4: Increment/decrement on pointer - ptr++, ++ptr, ptr--, --ptr
+            if prev in ("++", "--") or nxt in ("++", "--"):
+                bits |= WRITTEN
+
+            if prev == "*" and prev2 == "(" and nxt == ")":
+                # Pattern 5: Increment/decrement on dereferenced pointer - (*ptr)++, ++(*ptr)
+                if prev3 in ("++", "--") or nxt2 in ("++", "--"):
+                    bits |= WRITTEN
+                # Pattern 6: Assignment to dereferenced pointer in parentheses - (*param) = value
+                if nxt2[:1] == "=":
+                    bits |= WRITTEN
+
+            # Pattern 8: inside the arguments of a Write/Set call
+            if k < write_until:
+                bits |= WRITTEN
+
+            # === READ PATTERNS ===
 
-        is_written = False
-        is_read = False
-
-        # Pattern 1: Pointer dereference writes - *param = value
-        ptr_deref_write = re.search(rf"\*\s*{esc}\s*=", body)
-        if ptr_deref_write:
-            is_written = True
-
-        # Pattern 2: Array access writes - param[i] = value
-        array_write = re.search(rf"\b{esc}\s*\[[^\]]+\]\s*=", body)
-        if array_write:
-            is_written = True
-
-        # Pattern 3: Structure member writes - param->field = value
-        arrow_write = re.search(rf"\b{esc}\s*->\s*\w+\s*=", body)
-        if arrow_write:
-            is_written = True
-
-        # Pattern 4: Increment/decrement on pointer - ptr++, ++ptr, ptr--, --ptr
-        inc_dec = re.search(rf"(?:\+\+|--)\s*{esc}\b|\b{esc}\s*(?:\+\+|--)", body)
-        if inc_dec:
-            is_written = True
-
-        # Pattern 5: Increment/decrement on dereferenced pointer - (*ptr)++, ++(*ptr)
-        deref_inc_dec = re.search(rf"(?:\+\+|--)\s*\(\s*\*\s*{esc}\s*\)|\(\s*\*\s*{esc}\s*\)\s*(?:\+\+|--)", body)
-        if deref_inc_dec:
-            is_written = True
-
-        # Pattern 6: Assignment to dereferenced pointer in parentheses - (*param) = value
-        paren_ptr_write = re.search(rf"\(\s*\*\s*{esc}\s*\)\s*=", body)
-        if paren_ptr_write:
-            is_written = True
-
-        # Pattern 7: Function calls with param as destination (first parameter typically)
-        # memcpy(dest, src, len) - dest is OUT
-        memcpy_out = re.search(rf"\b(?:memcpy|strcpy|sprintf|snprintf)\s*\(\s*{esc}\s*,", body)
-        if memcpy_out:
-            is_written = True
-
-        # Pattern 8: Write APIs - functions with Write/Set in name
-        write_api = re.search(rf"\b\w*(?:Write|Set)\w*\s*\([^;]*\b{esc}\b", body)
-        if write_api:
-            is_written = True
-
-        # === READ PATTERNS ===
-
-        # Pattern 9: Pointer dereference reads - value = *param
-        ptr_deref_read = re.search(rf"=\s*\*\s*{esc}\b", body)
-        if ptr_deref_read:
-            is_read = True
-
-        # Pattern 10: Array access reads - value = param[i]
-        array_read = re.search(rf"=\s*{esc}\s*\[[^\]]+\]", body)
-        if array_read:
-            is_read = True
-
-        # Pattern 11: Structure member reads - value = param->field
-        arrow_read = re.search(rf"=\s*{esc}\s*->\s*\w+", body)
-        if arrow_read:
-            is_read = True
-
-        # Pattern 12: Function calls with param as source (second parameter typically)
-        # memcpy(dest, src, len) - src is IN
-        memcpy_in = re.search(rf"\b(?:memcpy|strcpy|strcmp|strncmp)\s*\([^,]+,\s*{esc}\s*[,\)]", body)
-        if memcpy_in:
-            is_read = True
-
-        # Pattern 13: Read APIs - functions with Read/Get in name
-        read_api = re.search(rf"\b\w*(?:Read|Get)\w*\s*\([^;]*\b{esc}\b", body)
-        if read_api:
-            is_read = True
-
-        # Pattern 14: Parameter used in comparison or condition
-        condition_use = re.search(rf"(?:if|while|for|switch)\s*\([^)]*\b{esc}\b", body)
-        if condition_use:
-            is_read = True
-
-        # Pattern 15: Parameter used in expressions (right side of operations)
-        expr_use = re.search(rf"[+\-*/%&|^<>]\s*{esc}\b|\b{esc}\s*[+\-*/%&|^<>]", body)
-        if expr_use:
-            is_read = True
+            # Pattern 9: Pointer dereference reads - value = *param
+            if prev == "*" and prev2[-1:] == "=":
+                bits |= READ
 
+            if prev[-1:] == "=":
+                # Pattern 10: Array access reads - value = param[i]
+                if nxt == "[" and k + 2 < next_tok("]", k + 2) < n:
+                    bits |= READ
+                # Pattern 11: Structure member reads - value = param->field
+                if nxt == "->" and kind[k + 2] in PARAM_WORD_KINDS:
+                    bits |= READ
+
+            # Pattern 13/14: inside the arguments of a Read/Get call or a condition
+            if k < read_until or k < cond_until:
+                bits |= READ
+
+            # Pattern 15: Parameter used in expressions (right side of operations)
+            if prev[-1:] in PARAM_EXPR_OPS or nxt[:1] in PARAM_EXPR_OPS:
+                bits |= READ
+
+            state[tk] |= bits
+
+    for p, bits in state.items():
         # Classify based on usage
-        if is_written and is_read:
+        if bits & WRITTEN and bits & READ:
             result[p] = "INOUT"
-        elif is_written:
+        elif bits & WRITTEN:
             result[p] = "OUT"
-        elif is_read:
-            result[p] = "IN"
         else:
-            # Parameter not used in body, assume IN
+            # Read, or not used in body at all: assume IN
             result[p] = "IN"
 
     return result
 
+
+# RTE API prefixes and the port set each call is reported under
+RTE_API_PREFIXES = {
+    "Rte_Read": "in", "Rte_DRead": "in", "Rte_IRead": "in", "Rte_Receive": "in",
+    "Rte_IReadRef": "in", "Rte_IrvRead": "in", "Rte_IsUpdated": "in", "Rte_Mode_": "in",
+    "Rte_Write": "out", "Rte_IrvWrite": "out", "Rte_IWrite": "out", "Rte_IWriteRef": "out",
+    "Rte_Switch": "out",
+    "Rte_Call_": "call",
+}
+
+
+def build_keyword_trie(keywords: dict) -> dict:
+    """Character trie over the keys of keywords; a node's None entry holds the value of the key ending there."""
+    root = {}
+    for word, value in keywords.items():
+        node = root
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[None] = value
+    return root
+
+
+def match_keyword_prefix(trie: dict, text: str):
+    """Value of the shortest key in trie that text starts with, or None."""
+    node = trie
+    for ch in text:
+        node = node.get(ch)
+        if node is None:
+            return None
+        if None in node:
+            return node[None]
+    return None
+
+
+RTE_API_TRIE = build_keyword_trie(RTE_API_PREFIXES)
+
+
+def analyze_body(tokens: CTokenStream, first: int, last: int) -> tuple[set, set, set, set, set]:
+    """
+    Walk the code tokens between indices first and last (exclusive) once.
+    Returns (rte_inputs, rte_outputs, rte_calls, plain_calls, used_types) as sets of names;
+    comments, strings and preprocessor lines never contribute.
+    """
+    src, kinds, starts, ends = tokens.src, tokens.kinds, tokens.starts, tokens.ends
+    inputs, outputs, rte_calls, plain, used = set(), set(), set(), set(), set()
+    ports = {"in": inputs, "out": outputs}
+
+    for i in tokens.indices(first, last):
+        if kinds[i] != T_IDENT or i + 1 >= last:
+            continue
+        word = src[starts[i]:ends[i]]
+        nxt = i + 1
+
+        # name ( ... ) is a call; Rte_ calls go to their port set instead of the plain calls
+        if kinds[nxt] == T_PUNCT and src[starts[nxt]] == "(":
+            if word.startswith("Rte_"):
+                api = match_keyword_prefix(RTE_API_TRIE, word)
+                if api == "call":
+                    if len(word) > len("Rte_Call_"):
+                        rte_calls.add(word)
+                elif api is not None:
+                    ports[api].add(word)
+            plain.add(word)
+            continue
+
+        # Type name = / Type name ; declares a local of that type
+        if kinds[nxt] == T_IDENT and i + 2 < last:
+            after = i + 2
+            if kinds[after] == T_PUNCT and src[starts[after]] in "=;":
+                used.add(word)
+
+    return inputs, outputs, rte_calls, plain, used
+
 def get_trigger_comment(comments: list, pos: int) -> str:
-    trig_rx = re.compile(r"-\s*triggered\s+(?:on|by)\s+([^\n\r]+)", re.IGNORECASE)
-    best_end, best_txt = -1, ""
-    for end, txt in comments:
-        if end <= pos and end > best_end and trig_rx.search(txt):
-            best_end, best_txt = end, txt
-    return best_txt
+    if not isinstance(comments, CommentIndex):
+        comments = CommentIndex(comments)
+    return comments.nearest(pos, CommentIndex.TRIGGER)
 
 def parse_doxygen_comment(comment: str) -> str:
     """
@@ -717,20 +1317,21 @@ def parse_doxygen_comment(comment: str) -> str:
 
     return ""
 
-def get_doxygen_comment(src: str, comments: list, pos: int) -> str:
+def get_doxygen_comment(src: str, comments: list, pos: int, lines: LineIndex = None) -> str:
     """
     Find the closest Doxygen comment before the function position.
     Handles both /** */ and /// style comments.
     """
     # Look for /// style comments first (they're usually directly above the function)
-    snippet_before = src[:pos]
-    lines = snippet_before.split('\n')
+    if lines is None:
+        lines = LineIndex(src)
+    last = lines.line_of(pos) - 1
 
     # Go backwards from the function position
     doxygen_lines = []
     found_function_line = False
-    for i in range(len(lines) - 1, -1, -1):
-        line = lines[i].strip()
+    for i in range(last, -1, -1):
+        line = lines.text(i, pos).strip()
 
         if not found_function_line and line:
             # This is the function declaration line, skip it
@@ -747,128 +1348,186 @@ def get_doxygen_comment(src: str, comments: list, pos: int) -> str:
         combined = '\n'.join(doxygen_lines)
         return parse_doxygen_comment(combined)
 
-    # Look for block comments (/** */ or /*!)
-    best_end, best_txt = -1, ""
-    for end, txt in comments:
-        # Check if it's a Doxygen comment (starts with /** or /*!)
-        if end <= pos and (txt.strip().startswith('/**') or txt.strip().startswith('/*!')):
-            # Exclude AUTOSAR-generated comments
-            if "DO NOT CHANGE THIS COMMENT!" in txt:
-                continue
+    # Look for block comments (/** */ or /*!), AUTOSAR-generated banners excluded
+    if not isinstance(comments, CommentIndex):
+        comments = CommentIndex(comments)
+    code_end = comments.code_end_before(pos)
+    best_txt = ""
+    for end, txt in comments.iter_before(pos, CommentIndex.DOXYGEN):
+        # Only use this comment if there's no significant code between it and the function
+        if code_end is not None:
+            if end >= code_end:
+                best_txt = txt
+            break
 
-            # Check if there's code (not just whitespace/comments) between comment and function
-            between = src[end:pos]
-            # Remove whitespace and other comments
-            between_clean = re.sub(r'\s+', '', between)
-            between_clean = re.sub(r'//.*', '', between_clean)
-            between_clean = re.sub(r'/\*.*?\*/', '', between_clean)
+        # No token stream: check the text between comment and function directly
+        between = src[end:pos]
+        # Remove whitespace and other comments
+        between_clean = re.sub(r'\s+', '', between)
+        between_clean = re.sub(r'//.*', '', between_clean)
+        between_clean = re.sub(r'/\*.*?\*/', '', between_clean)
 
-            # Only use this comment if there's no significant code between it and the function
-            if not between_clean and end > best_end:
-                best_end, best_txt = end, txt
+        if not between_clean:
+            best_txt = txt
+            break
 
     if best_txt:
         return parse_doxygen_comment(best_txt)
 
     return ""
 
-def parse_macros(src: str) -> list[dict]:
-    """Extract #define macros from C source code."""
-    # Regex for a macro header: #define NAME [optional(param,list)] body-fragment
-    HEADER_RE = re.compile(r"^\s*#define\s+(\w+)\s*(\([^)]*\))?\s*(.*)", re.MULTILINE)
+class Record(Mapping):
+    """
+    Compact extraction record: fields live in __slots__ instead of a per-record dict.
+    It reads like a read-only dict keyed by field name, so exporters index it unchanged.
+    String lists are stored as tuples, and every string in them is interned, as are the
+    fields named in INTERNED (type names, kinds and scopes repeat across thousands of records).
+    """
+    __slots__ = ()
+    INTERNED = ()
 
-    def should_skip(body: str) -> bool:
-        """Return True if the macro should be excluded."""
-        stripped = body.strip()
-        if not stripped:
-            return True
-        return False
+    def __init__(self, **fields):
+        for key in self.__slots__:
+            value = fields[key]
+            if isinstance(value, list):
+                value = tuple(map(sys.intern, value))
+            elif key in self.INTERNED:
+                value = sys.intern(value)
+            setattr(self, key, value)
 
-    lines = src.split('\n')
-    macros = []
+    def __getitem__(self, key):
+        if key in self.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
 
-    i = 0
-    while i < len(lines):
-        m = HEADER_RE.match(lines[i])
-        if not m:
-            i += 1
-            continue
+    def __iter__(self):
+        return iter(self.__slots__)
 
-        line_number = i + 1  # Track line number (1-indexed)
-        name = m.group(1)              # macro name
-        paramlist = m.group(2)         # None if object-like macro
-        first = m.group(3).rstrip()    # first chunk of body
-
-        # Gather continuation lines ending in "\"
-        body_parts = [first]
-        while body_parts and body_parts[-1].endswith("\\"):
-            body_parts[-1] = body_parts[-1][:-1].rstrip()   # drop trailing "\"
-            i += 1
-            if i >= len(lines):
-                break
-            body_parts.append(lines[i].rstrip())
+    def __len__(self):
+        return len(self.__slots__)
 
-        body_text = " ".join(part.strip() for part in body_parts).strip()
+    def __repr__(self):
+        return f"{type(self).__name__}({self.as_dict()!r})"
 
-        # Remove comments from macro value
-        body_text = re.sub(r'/\*.*?\*/', '', body_text)  # Remove /* */ comments
-        body_text = re.sub(r'//.*', '', body_text).strip()  # Remove // comments and clean up
+    def as_dict(self) -> dict:
+        """Plain dict copy with lists, the shape parse_file used to return (for JSON export)."""
+        view = {}
+        for key in self.__slots__:
+            value = getattr(self, key)
+            view[key] = list(value) if isinstance(value, tuple) else value
+        return view
 
-        if not should_skip(body_text):
-            macros.append({
-                "name": name,
-                "value": body_text,
-                "lineNumber": line_number
-            })
+    def replace(self, **changes):
+        """Copy of the record with the given fields changed (the record itself stays as it is)."""
+        copy = object.__new__(type(self))
+        for key in self.__slots__:
+            setattr(copy, key, changes[key] if key in changes else getattr(self, key))
+        return copy
 
-        i += 1
 
-    return macros
+class FunctionInfo(Record):
+    """One extracted function definition."""
+    __slots__ = ("name", "syntax", "ret", "inParams", "outParams", "fnType", "trigger",
+                 "inputs", "outputs", "invoked", "used", "Sync_Async", "Reentrancy",
+                 "description", "lineNumber")
+    INTERNED = ("ret", "fnType", "Sync_Async", "Reentrancy")
 
-def parse_variables(src: str) -> list[dict]:
-    """Extract global and static global variables from C source code."""
-    variables = []
 
-    # Remove preprocessor directives and comments to avoid false matches in body detection
-    src_clean = re.sub(r'^\s*#.*$', '', src, flags=re.MULTILINE)
-    src_clean = re.sub(r'/\*[\s\S]*?\*/|//.*', '', src_clean)
+class MacroInfo(Record):
+    """One extracted #define."""
+    __slots__ = ("name", "value", "lineNumber")
 
-    # First, identify all function bodies to exclude local variables
-    function_bodies = []
 
-    # Find all functions (including FUNC macros, static, and global functions)
-    func_patterns = [
-        re.compile(r'FUNC\s*\([^)]*\)\s*[A-Za-z_]\w*\s*\([^)]*\)\s*\{', re.MULTILINE),
-        re.compile(r'(?:static\s+)?(?:inline\s+)?[A-Za-z_]\w*(?:\s*\*+)?\s+[A-Za-z_]\w*\s*\([^)]*\)\s*\{', re.MULTILINE)
-    ]
+class ResolvedMacroInfo(Record):
+    """A MacroInfo plus its integer value, "" when the macro is not an integer constant."""
+    __slots__ = ("name", "value", "resolved", "lineNumber")
 
-    for pattern in func_patterns:
-        for match in pattern.finditer(src_clean):
-            # Find the complete function body
-            start_pos = match.end() - 1  # position of opening '{'
-            brace_count = 1
-            pos = start_pos + 1
-
-            while pos < len(src_clean) and brace_count > 0:
-                if src_clean[pos] == '{':
-                    brace_count += 1
-                elif src_clean[pos] == '}':
-                    brace_count -= 1
-                pos += 1
-
-            if brace_count == 0:
-                function_bodies.append((start_pos, pos))
-            else:
-                 # If we reached end of file with unclosed braces, don't include this as a function body
-                 # This prevents the entire end of file from being marked as "inside function"
-                 pass
-
-    def is_inside_function(position):
-        """Check if a position is inside any function body."""
-        for start, end in function_bodies:
-            if start <= position <= end:
-                return True
-        return False
+
+class VariableInfo(Record):
+    """One extracted global, static global or extern variable."""
+    __slots__ = ("name", "dataType", "initialValue", "scope", "lineNumber")
+    INTERNED = ("dataType", "scope")
+
+
+def parse_macros(src: str, ctx: ParseContext = None) -> list[MacroInfo]:
+    """Extract #define macros from C source code."""
+    return list(iter_macros(src, ctx))
+
+def resolve_macros(macros: list, resolver: MacroResolver = None) -> list[ResolvedMacroInfo]:
+    """
+    The macros with their resolved integer values. resolver defaults to one built from
+    these macros; pass one built over a whole project to resolve names defined elsewhere.
+    """
+    if resolver is None:
+        resolver = MacroResolver(macros)
+    resolved = []
+    for m in macros:
+        value = resolver.resolve(m)
+        resolved.append(ResolvedMacroInfo(name=m["name"], value=m["value"],
+                                          resolved="" if value is None else str(value),
+                                          lineNumber=m["lineNumber"]))
+    return resolved
+
+def iter_macros(src: str, ctx: ParseContext = None):
+    """Yield the #define macros of C source code in source order."""
+    if ctx is None:
+        ctx = ParseContext(src)
+
+    # Preprocessor tokens already carry their "\" continuation lines
+    for start, text in ctx.tokens.preprocessor_lines():
+        if "define" not in text:
+            continue
+        codes, comment = [], None
+        for line in text.split("\n"):
+            code, comment, _ = directive_line_code(line, comment)
+            codes.append(code)
+        define = match_define(codes)
+
+        # Macros without a body (include guards, feature flags) are not documented
+        if define and define[2]:
+            yield MacroInfo(name=define[0], value=define[2], lineNumber=ctx.lines.line_of(start))
+
+def iter_macros_stream(lines):
+    """
+    Yield the #define macros read from lines (an open text file or any iterable of lines)
+    as they are found, without holding the source; for huge generated headers.
+    """
+    for line_number, name, _, body in iter_defines(lines):
+        if body:
+            yield MacroInfo(name=name, value=body, lineNumber=line_number)
+
+def iter_macros_path(path):
+    """iter_macros_stream over a header file read in buffered binary lines, each decoded on its own."""
+    with open(path, "rb") as f:
+        yield from iter_macros_stream(decode_source(raw) for raw in f)
+
+
+def parse_variables(src: str, ctx: ParseContext = None) -> list[VariableInfo]:
+    """Extract global and static global variables from C source code."""
+    variables = list(iter_variables(src, ctx))
+    return sorted(variables, key=declaration_kind)
+
+def declaration_kind(var: VariableInfo) -> int:
+    """Sort key giving the historical variable order: externs, then scalars, then arrays."""
+    if var.scope == "Extern":
+        return 0
+    return 2 if var.dataType.endswith("]") else 1
+
+def iter_variables(src: str, ctx: ParseContext = None):
+    """Yield the global, static global and extern variables of C source code in source order."""
+    # Blank out preprocessor directives and comments to avoid false matches in body detection.
+    # Blanking keeps every offset valid, so positions map straight back to src and its lines.
+    if ctx is None:
+        ctx = ParseContext(src)
+    tokens, lines = ctx.tokens, ctx.lines
+    src_clean = tokens.blanked_text()
+
+    def group_text(match, group):
+        """Text of a match group as written in src, minus any comments inside it."""
+        return tokens.code_text(match.start(group), match.end(group))
+
+    # First, reuse the function bodies found by the function extractor to exclude local variables
+    function_bodies = ctx.function_bodies()
 
     # Second, identify all struct/union definition blocks to exclude member variables
     struct_definitions = []
@@ -880,83 +1539,41 @@ def parse_variables(src: str) -> list[dict]:
         re.MULTILINE
     )
 
-    for match in struct_pattern.finditer(src_clean):
+    for match in checkpoints(struct_pattern.finditer(src_clean), tokens.cancel_token):
         # Find the complete struct/union definition body
         start_pos = match.end() - 1  # position of opening '{'
-        brace_count = 1
-        pos = start_pos + 1
-
-        while pos < len(src_clean) and brace_count > 0:
-            if src_clean[pos] == '{':
-                brace_count += 1
-            elif src_clean[pos] == '}':
-                brace_count -= 1
-            pos += 1
-
-        if brace_count == 0:
-            struct_definitions.append((start_pos, pos))
-
-    def is_inside_struct_definition(position):
-        """Check if a position is inside any struct/union definition."""
-        for start, end in struct_definitions:
-            if start <= position <= end:
-                return True
-        return False
+        end_pos = tokens.match_end(start_pos)
 
-    def find_in_original_src(pattern, var_name, data_type):
-        """
-        Find variable declaration in original src to get accurate line number.
-        Search for the variable name and data type combination.
-        """
-        # Create a simpler pattern to find this specific variable in original source
-        search_pattern = rf'\b{re.escape(data_type)}\s+{re.escape(var_name)}\b'
-        for match in re.finditer(search_pattern, src):
-            # Return the position in original source
-            return match.start()
-        # Fallback: just search for variable name
-        search_pattern = rf'\b{re.escape(var_name)}\s*[=;\[]'
-        for match in re.finditer(search_pattern, src):
-            return match.start()
-        return None
+        if end_pos >= 0:
+            struct_definitions.append((start_pos, end_pos))
 
-    # Debug: Print function bodies for troubleshooting
-    #print(f"Function bodies detected: {len(function_bodies)} functions")
-    #for start, end in function_bodies:
-    #    print(f"  Function body: chars {start}-{end}")
+    # Function bodies and struct/union blocks are never scanned for declarations
+    excluded_regions = SpanIndex(
+        list(zip(function_bodies.starts, function_bodies.ends)) + struct_definitions)
 
-    # Pattern for extern variable declarations
-    extern_var_pattern = re.compile(r'''
-        ^[ \t]*                                    # start of line, optional whitespace
-        (extern\s+)                                # extern keyword
-        ([A-Za-z_]\w*(?:\s*\*+)?)                 # data type (with optional pointers)
-        \s+                                        # whitespace
-        ([A-Za-z_]\w*)                            # variable name
-        \s*;(?=\s|$)                                       # semicolon (extern vars don't have initialization)
-        ''', re.MULTILINE | re.VERBOSE)
-    
-    # Pattern for static/regular variable declarations
-    static_var_pattern = re.compile(r'''
+    # One declaration pattern: extern, array or scalar, told apart by which groups matched
+    declaration_pattern = re.compile(r'''
         ^[ \t]*                                    # start of line, optional whitespace
-        (static\s+)?                               # optional 'static' keyword
-        ([A-Za-z_]\w*(?:\s*\*+)?)                 # data type (with optional pointers)
-        \s+                                        # whitespace
-        ([A-Za-z_]\w*)                            # variable name
-        (?:\s*=\s*([^;]+))?                       # optional initialization
-        \s*;(?=\s|$)                                       # semicolon
-        ''', re.MULTILINE | re.VERBOSE)
-    
-    # Array pattern: type name[size] = {...};
-    static_array_pattern = re.compile(r'''
-        ^[ \t]*                                    # start of line, optional whitespace
-        (static\s+)?                               # optional 'static' keyword
-        ([A-Za-z_]\w*(?:\s*\*+)?)                 # data type
-        \s+                                        # whitespace
-        ([A-Za-z_]\w*)                            # variable name
-        \s*\[([^\]]*)\]                           # array brackets with size
-        (?:\s*=\s*\{([^}]*)\})?                   # optional array initialization
-        \s*;(?=\s|$)                                       # semicolon
+        (?:
+            (?P<extern>extern\s+)                  # extern keyword
+            (?P<extern_type>[A-Za-z_]\w*(?:\s*\*+)?)  # data type (with optional pointers)
+            \s+                                    # whitespace
+            (?P<extern_name>[A-Za-z_]\w*)          # variable name (extern vars don't have initialization)
+        |
+            (?P<static>static\s+)?                 # optional 'static' keyword
+            (?P<type>[A-Za-z_]\w*(?:\s*\*+)?)      # data type (with optional pointers)
+            \s+                                    # whitespace
+            (?P<name>[A-Za-z_]\w*)                 # variable name
+            (?:
+                \s*\[(?P<size>[^\]]*)\]            # array brackets with size
+                (?:\s*=\s*\{(?P<array_init>[^}]*)\})?  # optional array initialization
+            |
+                (?:\s*=\s*(?P<init>[^;]+))?       # optional scalar initialization
+            )
+        )
+        \s*;(?=\s|$)                               # semicolon
         ''', re.MULTILINE | re.VERBOSE)
-    
+
     # Keywords to exclude as variable names (control flow, etc.)
     exclude_var_names = {
         'if', 'for', 'while', 'switch', 'do', 'else', 'case', 'return',
@@ -968,223 +1585,164 @@ def parse_variables(src: str) -> list[dict]:
         'typedef', 'struct', 'union', 'enum', 'extern', 'register',
         'auto', 'volatile', 'const', 'inline'
     }
-    
-    # Find extern variable declarations
-    for match in extern_var_pattern.finditer(src_clean):
-        if is_inside_function(match.start()):
-            continue
-
-        # Skip if inside struct/union definition
-        if is_inside_struct_definition(match.start()):
-            continue
-
-        extern_kw = match.group(1)
-        data_type = match.group(2).strip()
-        var_name = match.group(3)
-
-        if extern_kw and var_name not in exclude_var_names and data_type.lower() not in exclude_data_types:
-            # Find position in original source for accurate line number
-            src_pos = find_in_original_src(match, var_name, data_type)
-            if src_pos is not None:
-                line_number = get_line_number(src, src_pos)
-                variables.append({
-                    "name": var_name,
-                    "dataType": data_type,
-                    "initialValue": "",
-                    "scope": "Extern",
-                    "lineNumber": line_number
-                })
-
-    # Find static/regular variable declarations
-    for match in static_var_pattern.finditer(src_clean):
-        static_kw = match.group(1)
-        data_type = match.group(2).strip()
-        var_name = match.group(3)
-        init_value = match.group(4).strip() if match.group(4) else ""
-
-        if is_inside_function(match.start()):
-            continue
-
-        # Skip if inside struct/union definition
-        if is_inside_struct_definition(match.start()):
-            continue
-
-        if var_name in exclude_var_names or data_type.lower() in exclude_data_types:
-            continue
-
-        # Check if this looks like a function (has parentheses immediately after the name, before semicolon)
-        # The match already ends at semicolon, so we don't need this check anymore
-        # (it was causing false positives with macros on subsequent lines)
-
-        # Skip if it looks like a function pointer or typedef
-        full_match = match.group(0)
-        if '(*' in full_match or 'typedef' in full_match:
-            continue
-
-        scope = "Static Global" if static_kw else "Global"
-
-        # Find position in original source for accurate line number
-        src_pos = find_in_original_src(match, var_name, data_type)
-        if src_pos is not None:
-            line_number = get_line_number(src, src_pos)
-            variables.append({
-                "name": var_name,
-                "dataType": data_type,
-                "initialValue": init_value,
-                "scope": scope,
-                "lineNumber": line_number
-            })
-
-    # Find array declarations
-    for match in static_array_pattern.finditer(src_clean):
-        if is_inside_function(match.start()):
-            continue
-
-        # Skip if inside struct/union definition
-        if is_inside_struct_definition(match.start()):
-            continue
 
-        static_kw = match.group(1)
-        data_type = match.group(2).strip()
-        var_name = match.group(3)
-        array_size = match.group(4).strip() if match.group(4) else ""
-        init_value = match.group(5).strip() if match.group(5) else ""
-
-        if var_name in exclude_var_names or data_type.lower() in exclude_data_types:
-            continue
-
-        scope = "Static Global" if static_kw else "Global"
-
-        # Find position in original source for accurate line number
-        src_pos = find_in_original_src(match, var_name, data_type)
-        if src_pos is not None:
-            line_number = get_line_number(src, src_pos)
-            full_type = f"{data_type}[{array_size}]"
-
-            variables.append({
-                "name": var_name,
-                "dataType": full_type,
-                "initialValue": init_value,
-                "scope": scope,
-                "lineNumber": line_number
-            })
-
-    # Post-processing: Clean up any remaining preprocessor keywords from datatypes
+    # Post-processing: drop declarations whose type still carries a preprocessor keyword
     preprocessor_keywords = {
         'endif', 'if', 'ifdef', 'ifndef', 'else', 'elif', 'define', 'include', 
         'undef', 'pragma', 'warning', 'error', 'line'
     }
-    
-    cleaned_variables = []
-    for var in variables:
-        # Check if dataType contains any preprocessor keywords
-        datatype_words = var['dataType'].lower().split()
-        if not any(word in preprocessor_keywords for word in datatype_words):
-            cleaned_variables.append(var)
-        # Optionally, I can clean individual words instead of removing entire variable:
-        # cleaned_datatype = ' '.join(word for word in var['dataType'].split() 
-        #                            if word.lower() not in preprocessor_keywords)
-        # if cleaned_datatype.strip():
-        #     var['dataType'] = cleaned_datatype.strip()
-        #     cleaned_variables.append(var)
-    
-    return cleaned_variables
 
-def get_line_number(src: str, pos: int) -> int:
+    for gap_start, gap_end in excluded_regions.gaps(len(src_clean)):
+        # The scan may look at the excluded region's opening brace, so ';{' still fails the lookahead
+        for match in checkpoints(declaration_pattern.finditer(src_clean, gap_start, gap_end + 1),
+                                 tokens.cancel_token):
+            if match.group('extern'):
+                data_type = group_text(match, 'extern_type').strip()
+                var_name = match.group('extern_name')
+
+                if var_name in exclude_var_names or data_type.lower() in exclude_data_types:
+                    continue
+
+                # Offsets are shared with src, so the line number comes straight from the index
+                line_number = get_line_number(src, match.start('extern_type'), lines)
+                var = VariableInfo(
+                    name=var_name,
+                    dataType=data_type,
+                    initialValue="",
+                    scope="Extern",
+                    lineNumber=line_number
+                )
+            else:
+                static_kw = match.group('static')
+                data_type = group_text(match, 'type').strip()
+                var_name = match.group('name')
+
+                if var_name in exclude_var_names or data_type.lower() in exclude_data_types:
+                    continue
+
+                scope = "Static Global" if static_kw else "Global"
+
+                # Offsets are shared with src, so the line number comes straight from the index
+                line_number = get_line_number(src, match.start('type'), lines)
+
+                if match.group('size') is not None:
+                    # Array declaration: type name[size] = {...};
+                    array_size = group_text(match, 'size').strip()
+                    init_value = group_text(match, 'array_init').strip() if match.group('array_init') else ""
+                    var = VariableInfo(
+                        name=var_name,
+                        dataType=f"{data_type}[{array_size}]",
+                        initialValue=init_value,
+                        scope=scope,
+                        lineNumber=line_number
+                    )
+                else:
+                    # Skip if it looks like a function pointer or typedef
+                    full_match = match.group(0)
+                    if '(*' in full_match or 'typedef' in full_match:
+                        continue
+
+                    init_value = group_text(match, 'init').strip() if match.group('init') else ""
+                    var = VariableInfo(
+                        name=var_name,
+                        dataType=data_type,
+                        initialValue=init_value,
+                        scope=scope,
+                        lineNumber=line_number
+                    )
+
+            # Check if dataType contains any preprocessor keywords
+            datatype_words = var.dataType.lower().split()
+            if not any(word in preprocessor_keywords for word in datatype_words):
+                yield var
+
+def get_line_number(src: str, pos: int, lines: LineIndex = None) -> int:
     """Convert string position to line number (1-indexed)."""
-    return src[:pos].count('\n') + 1
-
-def parse_file(src: str, cancel_token: CancellationToken = None) -> tuple[list, list, list]:
-    """Parse file and return (functions, macros, variables)."""
-    functions = []
-    reserved = {"if","for","while","switch","do","else","case","sizeof","abs","return", "endif"}
-    exclude_invoked = {
-        "VStdLib_MemCpy","VStdLib_MemSet","VStdLib_MemCmp",
-        "memcmp","memcpy","memset","sizeof","abs","return"
-    }
-
-    # Check for cancellation
-    if cancel_token and cancel_token.is_cancelled():
-        return [], [], []
-
-    comments = [(m.end(), m.group(0)) for m in re.finditer(r"/\*[\s\S]*?\*/", src)]
-
-    runnable_rx = re.compile(
-        r'^[ \t]*FUNC\s*\(\s*([A-Za-z_]\w*)\s*,\s*[A-Za-z_]\w*\s*\)\s*([A-Za-z_]\w*)\s*\(',
-        re.MULTILINE
-    )
-    static_rx = re.compile(r'''
-        ^[ \t]*static\s+(?:inline\s+)?                  
-        (?:
-          FUNC\s*\(\s*([A-Za-z_]\w*)\s*,\s*[A-Za-z_]\w*\s*\)  
-        |
-          ([A-Za-z_]\w*)                                
-        )
-        \s+([A-Za-z_]\w*)\s*\(                          
-        ''', re.MULTILINE|re.VERBOSE)
-    global_rx = re.compile(r'''
-        ^[ \t]*(?!static\b)(?!FUNC\b)                   
-        ([A-Za-z_]\w*(?:\s*\*+)?)\s+                    
-        (?!(?:if|for|while|switch|do|else|case)\b)      
-        ([A-Za-z_]\w*)\s*\(                             
-        ''', re.MULTILINE|re.VERBOSE)
-    sig_rx = re.compile(r'''
-        ^[ \t]*                                        
-        (?:static\s+)?(?:inline\s+)?                   
-        (?:FUNC\([^)]*\)\s*)?                          
-        (?P<ret>[\w\*\s]+?)\s+                         
-        (?P<name>[A-Za-z_]\w*)\s*                      
-        \((?P<params>[^)]*)\)                          
-        ''', re.MULTILINE|re.VERBOSE)
-
-    def extract(m, fnType):
-        if fnType == "Static":
-            retType = m.group(1) or m.group(2)
-            name    = m.group(3)
-        else:
-            retType, name = m.group(1), m.group(2)
-
-        # parameters
-        L = len(src)
-        depth, i = 1, m.end()
-        while i < L and depth:
-            depth += src[i] == "("
-            depth -= src[i] == ")"
-            i += 1
-        raw_params = src[m.end():i-1].strip()
-
-        # syntax
-        snippet = src[m.start():]
-        sig_m = sig_rx.match(snippet)
+    if lines is not None:
+        return lines.line_of(pos)
+    return src.count('\n', 0, pos) + 1
+
+# Every function field the exporters know, in export order
+FUNCTION_FIELDS = [
+    "Line Number", "Name", "Description", "Syntax", "Triggers", "In-Parameters", "Out-Parameters",
+    "Return Value", "Function Type", "Inputs", "Outputs",
+    "Invoked Operations", "Used Data Types", "Sync/Async", "Reentrancy"
+]
+
+# Function fields that need an analyzer beyond function discovery; the others cost nothing
+FUNCTION_FIELD_ANALYZERS = {
+    "Description":        "description",
+    "Syntax":             "syntax",
+    "Triggers":           "trigger",
+    "In-Parameters":      "params",
+    "Out-Parameters":     "params",
+    "Inputs":             "body",
+    "Outputs":            "body",
+    "Invoked Operations": "body",
+    "Used Data Types":    "body",
+}
+
+
+def function_parse_plan(fields: list[str] = None) -> frozenset:
+    """Names of the analyzers parse_file must run to fill the given function fields (None = all)."""
+    if fields is None:
+        return frozenset(FUNCTION_FIELD_ANALYZERS.values())
+    return frozenset(FUNCTION_FIELD_ANALYZERS[f] for f in fields if f in FUNCTION_FIELD_ANALYZERS)
+
+
+# Entity kinds parse_file can extract (the CLI's --parse values, besides 'all')
+PARSE_KINDS = ("functions", "macros", "variables")
+
+
+# Words that are never a used type or an invoked operation
+FUNCTION_RESERVED = {"if","for","while","switch","do","else","case","sizeof","abs","return", "endif"}
+EXCLUDE_INVOKED = {
+    "VStdLib_MemCpy","VStdLib_MemSet","VStdLib_MemCmp",
+    "memcmp","memcpy","memset","sizeof","abs","return"
+}
+
+# Function signature as written, for the Syntax field
+SIGNATURE_RX = re.compile(r'''
+    ^[ \t]*
+    (?:static\s+)?(?:inline\s+)?
+    (?:FUNC\([^)]*\)\s*)?
+    (?P<ret>[\w\*\s]+?)\s+
+    (?P<name>[A-Za-z_]\w*)\s*
+    \((?P<params>[^)]*)\)
+    ''', re.MULTILINE|re.VERBOSE)
+
+
+def extract_function(ctx: ParseContext, fn: tuple, plan: frozenset) -> FunctionInfo:
+    """Build the record of one function found by ParseContext.functions(), running only the analyzers in plan."""
+    fnType, start, retType, name, paren, close, k, brace_end = fn
+    src, tokens, lines = ctx.src, ctx.tokens, ctx.lines
+    kinds, starts, ends = tokens.kinds, tokens.starts, tokens.ends
+
+    # parameters
+    params_pos = ends[paren]
+    raw_params = src[params_pos:starts[close]].strip()
+
+    # syntax (matched in place, no copy of the rest of the file)
+    syntax = ""
+    if "syntax" in plan:
+        sig_m = SIGNATURE_RX.match(src, start)
         if sig_m:
             syntax = f"{sig_m.group('ret').strip()} {sig_m.group('name')}({sig_m.group('params').strip()})"
         else:
             syntax = f"{retType} {name}({raw_params})"
 
-        # skip prototypes
-        pos = i
-        while pos < L and (src[pos].isspace() or src.startswith("/*", pos)):
-            pos = src.find("*/", pos) + 2 if src.startswith("/*", pos) else pos+1
-        if pos >= L or src[pos] != "{":
-            return
+    # body: the tokens strictly between the braces (to the end of the file if unclosed)
+    body_last = brace_end if brace_end >= 0 else len(kinds)
 
-        # body
-        brace_idx, depth, j = pos, 1, pos+1
-        while j < L and depth:
-            depth += src[j] == "{"
-            depth -= src[j] == "}"
-            j += 1
-        body = src[brace_idx+1:j-1]
-        code = re.sub(r'/\*[\s\S]*?\*/|//.*', '', body)
-
-        # trigger
-        if fnType == "Runnable":
-            cm = get_trigger_comment(comments, m.start())
-            trigs = re.findall(r"-\s*triggered\s+(?:on|by)\s+([^\n\r]+)", cm, re.IGNORECASE)
-            trigger = "; ".join(t.strip() for t in trigs)
-        else:
-            trigger = ""
+    # trigger
+    trigger = ""
+    if fnType == "Runnable" and "trigger" in plan:
+        cm = get_trigger_comment(ctx.comments, start) or ctx.leading_trigger
+        trigs = TRIGGER_RX.findall(cm)
+        trigger = "; ".join(t.strip() for t in trigs)
 
+    inP, outP = [], []
+    if "params" in plan:
         # params names and types
         parts = [p.strip() for p in re.split(r",(?![^(]*\))", raw_params) if p.strip()]
         names = []
@@ -1195,7 +1753,7 @@ def parse_file(src: str, cancel_token: CancellationToken = None) -> tuple[list,
             names.append(mm.group(1) if mm else p)
 
         # IN/OUT classification with enhanced pointer analysis
-        dirs = classify_params(body, names, parts)
+        dirs = classify_params(None, names, parts, tokens, k, body_last)
 
         # AUTOSAR macro overrides
         for orig, nm in zip(parts, names):
@@ -1209,85 +1767,636 @@ def parse_file(src: str, cancel_token: CancellationToken = None) -> tuple[list,
         inP  = [p for p in names if dirs[p] in ("IN","INOUT")]
         outP = [p for p in names if dirs[p] in ("OUT","INOUT")]
 
-        # RTE APIs
-        inputs  = sorted({x.split("(")[0] for x in re.findall(
-                     r"\bRte_(?:Read|DRead|IRead|Receive|IReadRef|IrvRead|IsUpdated|Mode_)[\w_]*\s*\(",
-                     body)})
-        outputs = sorted({x.split("(")[0] for x in re.findall(
-                     r"\bRte_(?:Write|IrvWrite|IWrite|IWriteRef|Switch)[\w_]*\s*\(",
-                     body)})
-
-        # invoked
-        calls = {x.split("(")[0] for x in re.findall(r"\bRte_Call_[\w_]+\s*\(", code)}
-        plain = re.findall(r"\b([A-Za-z_]\w*)\s*\(", code)
+    inputs, outputs, invoked, used = [], [], [], []
+    if "body" in plan:
+        # RTE ports, invoked operations and used types from one walk over the body tokens
+        rte_in, rte_out, calls, plain, used_types = analyze_body(tokens, k + 1, body_last)
+        inputs = sorted(rte_in)
+        outputs = sorted(rte_out)
+
         locals_ = {
             c for c in plain
-            if c not in reserved
-            and c not in exclude_invoked
+            if c not in FUNCTION_RESERVED
+            and c not in EXCLUDE_INVOKED
             and not c.startswith("Rte_")
             and c != name
         }
         invoked = sorted(c for c in calls|locals_ if not re.fullmatch(r"[A-Z][A-Z0-9_]*", c))
 
         # used types
-        used = sorted({
-            t for t in re.findall(r"\b([A-Za-z_]\w*)\s+[A-Za-z_]\w*\s*(?:[=;])", body)
-            if t.lower() not in reserved
-        })
-
-        # placeholders for GUI fields
-        sync_async = ""
-        reentrancy = ""
-
-        # Extract Doxygen description from comments above function
-        description = get_doxygen_comment(src, comments, m.start())
-
-        # Calculate line number
-        line_number = get_line_number(src, m.start())
-
-        functions.append({
-            "name":       name,
-            "syntax":     syntax,
-            "ret":        retType,
-            "inParams":   inP,
-            "outParams":  outP,
-            "fnType":     fnType,
-            "trigger":    trigger,
-            "inputs":     inputs,
-            "outputs":    outputs,
-            "invoked":    invoked,
-            "used":       used,
-            "Sync_Async": sync_async,
-            "Reentrancy": reentrancy,
-            "description": description,
-            "lineNumber": line_number
-        })
-
-    for m in runnable_rx.finditer(src):
-        if cancel_token and cancel_token.is_cancelled():
-            return [], [], []
-        extract(m, "Runnable")
+        used = sorted(t for t in used_types if t.lower() not in FUNCTION_RESERVED)
+
+    # placeholders for GUI fields
+    sync_async = ""
+    reentrancy = ""
+
+    # Extract Doxygen description from comments above function
+    description = get_doxygen_comment(src, ctx.comments, start, lines) if "description" in plan else ""
+
+    # Calculate line number
+    line_number = get_line_number(src, start, lines)
+
+    return FunctionInfo(
+        name=name,
+        syntax=syntax,
+        ret=retType,
+        inParams=inP,
+        outParams=outP,
+        fnType=fnType,
+        trigger=trigger,
+        inputs=inputs,
+        outputs=outputs,
+        invoked=invoked,
+        used=used,
+        Sync_Async=sync_async,
+        Reentrancy=reentrancy,
+        description=description,
+        lineNumber=line_number
+    )
 
-    for m in static_rx.finditer(src):
-        if cancel_token and cancel_token.is_cancelled():
-            return [], [], []
-        extract(m, "Static")
 
-    for m in global_rx.finditer(src):
-        if cancel_token and cancel_token.is_cancelled():
-            return [], [], []
-        extract(m, "Global")
+def parse_file(src: str, cancel_token: CancellationToken = None,
+               fields: list[str] = None, parse_types: list[str] = None,
+               ctx: ParseContext = None, defines: dict = None, timings: dict = None) -> tuple[list, list, list]:
+    """
+    Parse file and return (functions, macros, variables).
+    fields limits the function analysis to what those function fields need; the others stay empty.
+    parse_types lists the entity kinds to extract (None or 'all' = every kind); the rest come back empty.
+    defines (name -> value text) turns on conditional evaluation: branches they switch off are skipped.
+    timings, if given, collects the seconds spent per stage (lex, functions, macros, variables).
+    Cancelling cancel_token stops every stage within a few milliseconds; the records
+    extracted up to that point are returned.
+    """
+    functions, macros, variables = [], [], []
+    plan = function_parse_plan(fields)
+    if parse_types is None or 'all' in parse_types:
+        parse_types = PARSE_KINDS
 
-    # Check cancellation before parsing macros and variables
+    # Check for cancellation
     if cancel_token and cancel_token.is_cancelled():
-        return [], [], []
+        return functions, macros, variables
+
+    stage, stage_start = None, time.perf_counter()
 
-    # Parse macros and variables
-    macros = parse_macros(src)
-    variables = parse_variables(src)
+    def lap(next_stage=None):
+        """Close the timing of the running stage and start next_stage."""
+        nonlocal stage, stage_start
+        now = time.perf_counter()
+        if timings is not None and stage is not None:
+            timings[stage] = timings.get(stage, 0.0) + now - stage_start
+        stage, stage_start = next_stage, now
 
+    try:
+        # One lexer pass and one function discovery feed every extractor below
+        if ctx is None:
+            lap("lex")
+            if defines is not None:
+                src = blank_inactive(src, defines, cancel_token)
+            ctx = ParseContext(src, cancel_token=cancel_token)
+        else:
+            ctx.tokens.cancel_token = cancel_token
+        src = ctx.src
+
+        if "functions" in parse_types:
+            lap("functions")
+            for fn in ctx.functions():
+                if cancel_token and cancel_token.is_cancelled():
+                    raise ParseCancelled()
+                functions.append(extract_function(ctx, fn, plan))
+
+        # Parse macros and variables (variables reuse the function bodies to skip locals)
+        if "macros" in parse_types:
+            lap("macros")
+            macros.extend(iter_macros(src, ctx))
+        if "variables" in parse_types:
+            lap("variables")
+            variables.extend(iter_variables(src, ctx))
+    except ParseCancelled:
+        pass  # unwind with the records collected so far
+    lap()
+
+    variables.sort(key=declaration_kind)
     return functions, macros, variables
 
+
+# Function fields the discovery pass fills on its own, without any per-function analyzer
+FALLBACK_FIELDS = ["Line Number", "Name", "Return Value", "Function Type"]
+
+
+def parse_file_budgeted(src: str, budget: float, cancel_token: CancellationToken = None,
+                        fields: list[str] = None, parse_types: list[str] = None,
+                        defines: dict = None, jobs: int = 1, timings: dict = None):
+    """
+    parse_file (parse_file_parallel when jobs != 1) under a per-file budget in seconds.
+    Function discovery, macros and variables run first; if the per-function analyzers then
+    run over, the functions are rebuilt from the discovery with FALLBACK_FIELDS only, which
+    costs no second pass over the file; a file whose discovery, macros or variables run over
+    is given up. With jobs != 1 the workers must lex again for the fallback, so the first
+    parse gets half the budget and the fallback the rest.
+    The budget is checked between regex matches: a single match that backtracks badly
+    cannot be interrupted, so a file can run over by the time of its slowest match.
+    Returns (functions, macros, variables, status) with status "ok", "fallback" or "timeout".
+    """
+    # Conditionals, and the serial lexer pass, are linear and shared with the fallback,
+    # so only the caller's token stops them
+    ctx = None
+    lex_start = time.perf_counter()
+    try:
+        if defines is not None:
+            src = blank_inactive(src, defines, cancel_token)
+        if jobs == 1:
+            ctx = ParseContext(src, cancel_token=cancel_token)
+    except ParseCancelled:
+        return [], [], [], "ok"
+    if timings is not None:
+        timings["lex"] = time.perf_counter() - lex_start
+
+    def stopped():
+        """True once the caller cancelled; the partial records are then returned as they are."""
+        return cancel_token is not None and cancel_token.is_cancelled()
+
+    if jobs != 1:
+        start = time.monotonic()
+        token = DeadlineToken(budget / 2, cancel_token)
+        result = parse_file_parallel(src, token, fields, parse_types, jobs)
+        if not token.expired() or stopped():
+            return result + ("ok",)
+        # chunked again: a serial re-lex of a file big enough for --jobs would eat the budget alone
+        token = DeadlineToken(budget - (time.monotonic() - start), cancel_token)
+        result = parse_file_parallel(src, token, FALLBACK_FIELDS, parse_types, jobs)
+        if token.expired():
+            return [], [], [], "timeout"
+        return result + ("fallback",)
+
+    if parse_types is None or 'all' in parse_types:
+        parse_types = PARSE_KINDS
+    token = DeadlineToken(budget, cancel_token)
+    ctx.tokens.cancel_token = token
+    discovery_start = time.perf_counter()
+    try:
+        if "functions" in parse_types:
+            ctx.functions()
+    except ParseCancelled:
+        return ([], [], [], "ok") if stopped() else ([], [], [], "timeout")
+    if timings is not None:
+        timings["functions"] = time.perf_counter() - discovery_start
+
+    others = [kind for kind in parse_types if kind != "functions"]
+    _, macros, variables = parse_file(src, token, fields, others, ctx=ctx, timings=timings)
+    if token.expired() and not stopped():
+        return [], [], [], "timeout"
+    functions = []
+    if "functions" in parse_types:
+        functions = parse_file(src, token, fields, ["functions"], ctx=ctx, timings=timings)[0]
+        if token.expired() and not stopped():
+            functions = parse_file(src, cancel_token, FALLBACK_FIELDS, ["functions"], ctx=ctx, timings=timings)[0]
+            return functions, macros, variables, "fallback"
+    return functions, macros, variables, "ok"
+
+
+def iter_parse(src: str, cancel_token: CancellationToken = None,
+               fields: list[str] = None, parse_types: list[str] = None, defines: dict = None):
+    """
+    Yield FunctionInfo, MacroInfo and VariableInfo records one at a time in source order.
+    Takes the same options as parse_file; records are built lazily as they are consumed,
+    so a caller can start exporting before the rest of the file has been analyzed.
+    """
+    plan = function_parse_plan(fields)
+    if parse_types is None or 'all' in parse_types:
+        parse_types = PARSE_KINDS
+
+    if cancel_token and cancel_token.is_cancelled():
+        return
+
+    try:
+        if defines is not None:
+            src = blank_inactive(src, defines, cancel_token)
+        ctx = ParseContext(src, cancel_token=cancel_token)
+        streams = []
+        if "functions" in parse_types:
+            heads = sorted(ctx.functions(), key=lambda fn: fn[1])
+            streams.append(extract_function(ctx, fn, plan) for fn in heads)
+        if "macros" in parse_types:
+            streams.append(iter_macros(src, ctx))
+        if "variables" in parse_types:
+            streams.append(iter_variables(src, ctx))
+
+        for record in heapq.merge(*streams, key=attrgetter("lineNumber")):
+            if cancel_token and cancel_token.is_cancelled():
+                return
+            yield record
+    except ParseCancelled:
+        return
+
+
+def iter_parse_path(path, cancel_token: CancellationToken = None,
+                    fields: list[str] = None, parse_types: list[str] = None, defines: dict = None):
+    """iter_parse over the contents of a source file."""
+    yield from iter_parse(read_source(path), cancel_token, fields, parse_types, defines)
+
+
+# Files smaller than this are parsed in-process; worker start-up would cost more than it saves
+PARALLEL_MIN_BYTES = 1 << 20
+
+# Just enough of the lexer to track brace and paren depth: comments, directives and literals
+# are skipped whole (same shapes as C_TOKEN_RX), braces, semicolons and parens are reported
+TOP_LEVEL_RX = re.compile(r'''
+    (/\*[\s\S]*?(?:\*/|\Z)|//[^\n]*)                            # 1 comment
+  | (^[ \t]*\#(?://(?:\\\r?\n|[^\n])*|/\*[\s\S]*?\*/              # 2 preprocessor line (with comments,
+               |"(?:\\[\s\S]|[^"\\\n])*"?|'(?:\\[\s\S]|[^'\\\n])*'?     #   literals and continuations)
+               |\\\r?\n|[^\n])*)
+  | ("(?:\\[\s\S]|[^"\\\n])*"?)                                  # 3 string literal
+  | ('(?:\\[\s\S]|[^'\\\n])*'?)                                  # 4 char literal
+  | ([{}])                                                       # 5 brace
+  | (;)                                                          # 6 semicolon
+  | ([()])                                                       # 7 paren
+  | ([\[\]])                                                     # 8 bracket
+  | (=)                                                          # 9 assignment
+    ''', re.MULTILINE | re.VERBOSE)
+
+
+def split_top_level(src: str, chunks: int, cancel_token: CancellationToken = None) -> list[tuple]:
+    """
+    Cut src into about `chunks` pieces at the cut points of iter_top_level_cuts. Returns
+    (start, leading trigger, context start, context trigger) per piece: leading trigger is
+    the last trigger comment before the piece, and context start the cut point before it,
+    where parsing has to begin so the look back for /// comments sees what it sees in the
+    whole file (records before start are dropped again, see parse_chunk).
+    """
+    target = max(1, len(src) // max(1, chunks))
+    pieces = [(0, "", 0, "")]
+    previous = (0, "")
+    for cut, last_trigger in iter_top_level_cuts(src, cancel_token=cancel_token):
+        if cut - pieces[-1][0] >= target:
+            pieces.append((cut, last_trigger) + previous)
+        previous = (cut, last_trigger)
+    return pieces
+
+
+def iter_top_level_cuts(src: str, pos: int = 0, last_trigger: str = "",
+                        cancel_token: CancellationToken = None):
+    """
+    Yield (offset, leading trigger) for every line start after pos, outside any brace,
+    paren or bracket nesting, right after a line that ends in a top-level '}' or ';' -- the
+    places a parse can restart. That line must not start like a comment line ('*' or '//'),
+    so the look back for /// comments never runs through it.
+    No declaration match of iter_variables runs across a cut: an array size runs to the
+    next ']', so it is bracket nesting, and a '}' is no cut while an '=' since the last ';'
+    may still be waiting for its ';' (an initializer, or a block swallowed by one).
+    pos must be 0 or such a place, with last_trigger the trigger comment in force there.
+    """
+    depth = parens = brackets = 0
+    assigning = False
+    for m in checkpoints(TOP_LEVEL_RX.finditer(src, pos), cancel_token):
+        group = m.lastindex
+        if group == 1:
+            text = m.group(1)
+            if text.startswith("/*") and TRIGGER_RX.search(text):
+                last_trigger = text
+            continue
+        if group == 7:
+            parens = max(0, parens + (1 if m.group(7) == "(" else -1))
+            continue
+        if group == 8:
+            brackets = max(0, brackets + (1 if m.group(8) == "[" else -1))
+            continue
+        if group == 9:
+            assigning = True
+            continue
+        if group == 5:
+            depth += 1 if m.group(5) == "{" else -1
+            if depth < 0:
+                depth = 0
+            if depth or parens or brackets or assigning or m.group(5) == "{":
+                continue
+        elif group != 6:
+            continue
+        else:
+            assigning = False
+            if depth or parens or brackets:
+                continue
+
+        # top-level '}' or ';': a cut point if nothing but blanks follows on its line
+        eol = src.find("\n", m.end())
+        if eol < 0 or src[m.end():eol].strip():
+            continue
+        if src[src.rfind("\n", 0, m.start()) + 1:m.start()].lstrip().startswith(("*", "//")):
+            continue
+        if eol + 1 < len(src):
+            yield eol + 1, last_trigger
+
+
+# Directive name and the rest of the line
+DIRECTIVE_RX = re.compile(r"[ \t]*#[ \t]*(\w*)(.*)", re.DOTALL)
+
+
+def blank_inactive(src: str, defines: dict, cancel_token: CancellationToken = None) -> str:
+    """
+    Blank (to spaces, keeping line breaks) every region an #if/#ifdef/#ifndef/#elif/#else
+    branch switches off under the given defines, so no extractor sees disabled code.
+    #define/#undef lines in active code update the defines as the file goes.
+    A condition the defines cannot decide keeps its branch (and the following ones) active.
+    """
+    evaluator = MacroEvaluator(defines)
+
+    # One frame per open #if: [state, taken, undecided] where state is True/False/None for
+    # the current branch, taken means a branch was definitely chosen, undecided means a
+    # branch so far could not be decided
+    stack = []
+    regions = []
+    dead_from = -1   # start of the current blanked region, -1 while code is active
+
+    def is_active():
+        return all(frame[0] is not False for frame in stack)
+
+    for m in checkpoints(TOP_LEVEL_RX.finditer(src), cancel_token):
+        if m.lastindex != 2:
+            continue
+        d = DIRECTIVE_RX.match(m.group(2))
+        name, rest = d.group(1), strip_directive_comments(d.group(2))
+        was_active = is_active()
+
+        if name in ("if", "ifdef", "ifndef"):
+            if not was_active:
+                stack.append([False, True, False])
+            else:
+                if name == "if":
+                    cond = evaluator.evaluate(rest)
+                else:
+                    cond = evaluator.is_defined(rest.split()[0]) if rest else None
+                    if name == "ifndef" and cond is not None:
+                        cond = 1 - cond
+                state = None if cond is None else bool(cond)
+                stack.append([state, state is True, state is None])
+        elif name in ("elif", "else") and stack:
+            frame = stack[-1]
+            parent_active = all(f[0] is not False for f in stack[:-1])
+            if not parent_active or frame[1]:
+                frame[0] = False
+            else:
+                cond = evaluator.evaluate(rest) if name == "elif" else 1
+                if cond is None:
+                    frame[0], frame[2] = None, True
+                elif cond:
+                    frame[0], frame[1] = (None if frame[2] else True), True
+                else:
+                    frame[0] = False
+        elif name == "endif" and stack:
+            stack.pop()
+        elif name in ("define", "undef") and was_active:
+            macro = re.match(r"([A-Za-z_]\w*)(\()?\s*(.*)", rest, re.DOTALL)
+            if macro:
+                if any(frame[0] is None for frame in stack):
+                    # may or may not run: whether the name is defined is no longer known
+                    evaluator.forget(macro.group(1))
+                elif name == "undef":
+                    evaluator.undefine(macro.group(1))
+                else:
+                    # function-like macros are defined, but have no value a condition could use
+                    function_like = macro.group(2) is not None
+                    evaluator.define(macro.group(1), None if function_like else macro.group(3))
+            continue
+        else:
+            continue
+
+        now_active = is_active()
+        if was_active and not now_active:
+            dead_from = m.end()
+        elif now_active and not was_active and dead_from >= 0:
+            regions.append((dead_from, m.start()))
+            dead_from = -1
+
+    if dead_from >= 0:
+        regions.append((dead_from, len(src)))
+    if not regions:
+        return src
+
+    pieces = []
+    pos = 0
+    for start, end in regions:
+        pieces.append(src[pos:start])
+        pieces.append(BLANK_RX.sub(" ", src[start:end]))
+        pos = end
+    pieces.append(src[pos:])
+    return "".join(pieces)
+
+
+def parse_chunk(chunk: str, line_offset: int, leading_trigger: str,
+                fields: list[str] = None, parse_types: list[str] = None,
+                cancel_token: CancellationToken = None, context_lines: int = 0) -> tuple[list, list, list]:
+    """
+    Parse one piece from split_top_level and shift its line numbers into the whole file.
+    The first context_lines lines of chunk are only context: their records are dropped.
+    """
+    ctx = ParseContext(chunk, leading_trigger)
+    result = parse_file(chunk, cancel_token, fields, parse_types, ctx)
+    result = tuple([record for record in records if record.lineNumber > context_lines] for records in result)
+    for records in result:
+        for record in records:
+            record.lineNumber += line_offset
+    return result
+
+
+def parse_file_parallel(src: str, cancel_token: CancellationToken = None,
+                        fields: list[str] = None, parse_types: list[str] = None,
+                        workers: int = None, defines: dict = None) -> tuple[list, list, list]:
+    """
+    parse_file for giant sources: split at top-level boundaries, parse the pieces in a
+    process pool and merge them into the same (functions, macros, variables) parse_file returns.
+    Small files, and files with no usable cut point, are parsed in-process.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(src) < PARALLEL_MIN_BYTES:
+        return parse_file(src, cancel_token, fields, parse_types, defines=defines)
+
+    try:
+        # Conditionals span the whole file, so they are resolved before it is split
+        if defines is not None:
+            src = blank_inactive(src, defines, cancel_token)
+        pieces = split_top_level(src, workers * 4, cancel_token)
+    except ParseCancelled:
+        return [], [], []
+    if len(pieces) == 1:
+        return parse_file(src, cancel_token, fields, parse_types)
+
+    results = []
+    # Leaving the block terminates the workers: after a cancel a chunk may never finish on
+    # its own, so the pool is stopped rather than awaited
+    with multiprocessing.Pool(min(workers, len(pieces))) as pool:
+        pending = []
+        line_offset = 0
+        for k, (start, leading_trigger, context_start, context_trigger) in enumerate(pieces):
+            end = pieces[k + 1][0] if k + 1 < len(pieces) else len(src)
+            context_lines = src.count("\n", context_start, start)
+            pending.append(pool.apply_async(parse_chunk, (src[context_start:end], line_offset - context_lines,
+                                                          context_trigger, fields, parse_types, None,
+                                                          context_lines)))
+            line_offset += src.count("\n", start, end)
+
+        for chunk in pending:
+            while not chunk.ready():
+                if cancel_token and cancel_token.is_cancelled():
+                    break
+                chunk.wait(0.1)
+            else:
+                results.append(chunk.get())
+                continue
+            break  # cancelled: merge the chunks finished so far
+
+    # Same order as a whole-file parse: runnables, statics, globals; macros in source order;
+    # variables as externs, scalars, arrays
+    functions = sorted((f for r in results for f in r[0]), key=lambda f: FUNCTION_TYPE_RANK[f.fnType])
+    macros = [m for r in results for m in r[1]]
+    variables = sorted((v for r in results for v in r[2]), key=declaration_kind)
+    return functions, macros, variables
+
+
+# parse_file lists functions by type in this order, each type in source order
+FUNCTION_TYPE_RANK = {"Runnable": 0, "Static": 1, "Global": 2}
+
+
+def common_affixes(old: str, new: str) -> tuple[int, int]:
+    """Lengths of the common prefix of two texts and of the common suffix of what is left."""
+    limit = min(len(old), len(new))
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[lo:mid] == new[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    prefix = lo
+
+    old_end, new_end = len(old), len(new)
+    lo, hi = 0, limit - prefix
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[old_end - mid:old_end - lo] == new[new_end - mid:new_end - lo]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return prefix, lo
+
+
+class IncrementalParser:
+    """
+    parse_file for a file that is parsed again after every edit. The last text, its records
+    and its top-level cut points are kept; the next text is diffed against it and only the
+    stretch between the unchanged cut points around the edit goes through parse_file again.
+    Records before that stretch are reused as they are, records after it with their line
+    numbers shifted. The result is the one a whole-file parse_file gives.
+    """
+
+    def __init__(self):
+        self.src = None
+        self.options = None
+        self.result = None
+        self.cut_offsets = []   # ascending offsets in src where a parse can restart
+        self.cut_triggers = []  # leading trigger comment at each cut
+
+    def parse(self, src: str, cancel_token: CancellationToken = None,
+              fields: list[str] = None, parse_types: list[str] = None,
+              defines: dict = None) -> tuple[list, list, list]:
+        """Parse src like parse_file, reusing the records of the previous call where it is unchanged."""
+        options = (None if fields is None else tuple(fields),
+                   None if parse_types is None else tuple(parse_types),
+                   None if defines is None else tuple(sorted(defines.items())))
+        try:
+            # Conditionals span the whole file, so they are resolved before it is diffed
+            if defines is not None:
+                src = blank_inactive(src, defines, cancel_token)
+            if self.src is None or options != self.options:
+                return self.parse_whole(src, cancel_token, fields, parse_types, options)
+            return self.parse_edit(src, cancel_token, fields, parse_types)
+        except ParseCancelled:
+            return [], [], []
+
+    def parse_whole(self, src, cancel_token, fields, parse_types, options):
+        result = parse_file(src, cancel_token, fields, parse_types)
+        cuts = list(iter_top_level_cuts(src, cancel_token=cancel_token))
+        if not (cancel_token and cancel_token.is_cancelled()):
+            self.src, self.options, self.result = src, options, result
+            self.cut_offsets = [0] + [cut for cut, _ in cuts]
+            self.cut_triggers = [""] + [trigger for _, trigger in cuts]
+        return tuple(list(records) for records in result)
+
+    def parse_edit(self, src, cancel_token, fields, parse_types):
+        old = self.src
+        offsets, triggers = self.cut_offsets, self.cut_triggers
+        prefix, suffix = common_affixes(old, src)
+        delta = len(src) - len(old)
+
+        # Restart at the last cut before the edit; stop at the second cut in the unchanged tail
+        # that the old text had too, with the same trigger in force. One unchanged stretch
+        # on either side is parsed again: the look back for /// comments can run into the
+        # previous stretch (see iter_top_level_cuts), so the records on both sides of the
+        # edit see the same lines they see in a whole-file parse
+        k = bisect_right(offsets, prefix) - 1
+        start = offsets[k]
+        context_start, context_trigger = offsets[max(k - 1, 0)], triggers[max(k - 1, 0)]
+        tail = len(src) - suffix
+        end = len(src)
+        window_cuts = []
+        agreed = 0
+        for cut, trigger in iter_top_level_cuts(src, start, triggers[k], cancel_token):
+            if cut >= tail:
+                j = bisect_left(offsets, cut - delta)
+                if j < len(offsets) and offsets[j] == cut - delta and triggers[j] == trigger:
+                    agreed += 1
+                    if agreed == 2:
+                        end = cut
+                        break
+            window_cuts.append((cut, trigger))
+        else:
+            j = len(offsets)
+
+        line_offset = src.count("\n", 0, start)
+        context_lines = src.count("\n", context_start, start)
+        window = parse_chunk(src[context_start:end], line_offset - context_lines, context_trigger,
+                             fields, parse_types, cancel_token, context_lines)
+
+        # Old records from first_line on were in the window; from next_line on they follow it
+        first_line = line_offset + 1
+        if end < len(src):
+            next_line = line_offset + old.count("\n", start, end - delta) + 1
+            shift = src.count("\n", start, end) - old.count("\n", start, end - delta)
+        else:
+            next_line = None
+        result = []
+        for old_records, new_records in zip(self.result, window):
+            records = [r for r in old_records if r.lineNumber < first_line]
+            records.extend(new_records)
+            if next_line is not None:
+                records.extend(r.replace(lineNumber=r.lineNumber + shift) if shift else r
+                               for r in old_records if r.lineNumber >= next_line)
+            result.append(records)
+        functions, macros, variables = result
+        functions.sort(key=lambda f: (FUNCTION_TYPE_RANK[f.fnType], f.lineNumber))
+        variables.sort(key=lambda v: (declaration_kind(v), v.lineNumber))
+
+        if not (cancel_token and cancel_token.is_cancelled()):
+            self.src, self.result = src, (functions, macros, variables)
+            self.cut_offsets = offsets[:k + 1] + [cut for cut, _ in window_cuts] + [cut + delta for cut in offsets[j:]]
+            self.cut_triggers = triggers[:k + 1] + [trigger for _, trigger in window_cuts] + triggers[j:]
+        return list(functions), list(macros), list(variables)
+
+
+# One IncrementalParser per file the GUIs have parsed, so parsing a file again
+# after an edit only reparses the part that changed. Each holds a whole source and
+# its records, so only the most recently parsed files are kept (dict order = LRU order)
+incremental_parsers = {}
+INCREMENTAL_MAX_FILES = 8
+
+
+def incremental_parser(path) -> IncrementalParser:
+    """The IncrementalParser kept for path, created on first use; the least recently used one goes past the cap."""
+    key = os.path.abspath(path)
+    incremental = incremental_parsers.pop(key, None) or IncrementalParser()
+    incremental_parsers[key] = incremental
+    while len(incremental_parsers) > INCREMENTAL_MAX_FILES:
+        del incremental_parsers[next(iter(incremental_parsers))]
+    return incremental
+
 def show_gui_old():
     function_fields = [
       "Line Number", "Name", "Description", "Syntax", "Triggers", "In-Parameters", "Out-Parameters",
@@ -1296,7 +2405,7 @@ def show_gui_old():
     ]
 
     macro_fields = [
-        "Line Number", "Name", "Value"
+        "Line Number", "Name", "Value", "Resolved Value"
     ]
 
     variable_fields = [
@@ -1368,7 +2477,7 @@ def show_gui_old():
     macros_frame = ttk.Frame(notebook)
     notebook.add(macros_frame, text="Macros")
 
-    macro_vars = {f: tk.BooleanVar(value=(f != "Line Number")) for f in macro_fields}
+    macro_vars = {f: tk.BooleanVar(value=(f not in ("Line Number", "Resolved Value"))) for f in macro_fields}
 
     ttk.Label(macros_frame, text="Select macro fields:").grid(row=0, column=0, sticky="w", padx=10, pady=5)
 
@@ -1528,11 +2637,14 @@ def show_gui_old():
             try:
                 # Read file
                 progress.update_text("Reading file...")
-                src = open(cfile, encoding="utf-8").read()
+                src = read_source(cfile)
 
                 # Parse the file
                 progress.update_text(f"Parsing file ({len(src):,} bytes)...")
-                functions, macros, variables = parse_file(src, cancel_token)
+                functions, macros, variables = incremental_parser(cfile).parse(
+                    src, cancel_token, sel_function_fields)
+                if "Resolved Value" in sel_macro_fields:
+                    macros = resolve_macros(macros)
 
                 if cancel_token.is_cancelled() or progress.cancelled:
                     result["error"] = "cancelled"
@@ -1664,51 +2776,101 @@ def log_verbose(message, verbose=False):
         print(f"[INFO] {message}", file=sys.stderr)
 
 
-def process_file_cli(file_path, parse_types, output_path, output_formats, verbose=False, cancel_token=None):
-    """Process a single file in CLI mode"""
+def process_file_cli(file_path, parse_types, output_path, output_formats, verbose=False, cancel_token=None,
+                     fields=None, jobs=1, defines=None, resolve=False, macro_resolver=None,
+                     budget=None, report=None, cache=None, results=None):
+    """
+    Process a single file in CLI mode (fields limits the function fields computed and exported;
+    jobs > 1, or 0 for one per CPU, parses files of PARALLEL_MIN_BYTES and up in worker processes;
+    defines turns on #if evaluation; resolve adds resolved macro values, from macro_resolver
+    when a project-wide one is given; budget is the parse time limit in seconds, and report
+    collects a {file, status, timings} entry for the batch summary; cache, a ParseCache, skips
+    the parse of a file it holds the results of; results, a dict, receives the exported
+    records under file_path)
+    """
     log_verbose(f"Processing file: {file_path}", verbose)
+    timings = {}
+    status = "ok"
+    stage_start = time.perf_counter()
+
+    # Macro-only runs (generated *_Cfg.h / Rte_Type.h headers) stream the file instead of loading it
+    stream_macros = list(parse_types) == ["macros"] and defines is None
+
+    # Same bytes parsed with the same options before: the records come from the cache
+    cache_key = cached = None
+    if cache is not None:
+        try:
+            cache_key = cache.key(file_path, {"parse": sorted(parse_types), "defines": defines,
+                                              "fields": None if fields is None else sorted(fields)})
+            cached = cache.get(cache_key)
+        except OSError:
+            pass  # reported by the read below
+        timings["cache"] = time.perf_counter() - stage_start
+        stage_start = time.perf_counter()
 
     try:
-        with open(file_path, encoding="utf-8") as f:
-            src = f.read()
+        src = None if stream_macros or cached is not None else read_source(file_path)
+        file_size = os.path.getsize(file_path) if src is None else len(src)
     except Exception as e:
         print(f"❌ Error reading {file_path}: {e}", file=sys.stderr)
         return False
 
     # Show file size for progress estimation
-    file_size = len(src)
     if verbose:
         print(f"[INFO] File size: {file_size:,} bytes ({file_size / 1024:.1f} KB)", file=sys.stderr)
+    timings["read"] = time.perf_counter() - stage_start
 
     try:
         if verbose and TQDM_AVAILABLE:
             print("[INFO] Parsing file...", file=sys.stderr)
-        functions, macros, variables = parse_file(src, cancel_token)
+        if cached is not None:
+            log_verbose("Unchanged since it was cached, parse skipped", verbose)
+            functions, macros, variables = cached_records(cached)
+        elif stream_macros:
+            functions, macros, variables = [], list(iter_macros_path(file_path)), []
+        elif budget:
+            functions, macros, variables, status = parse_file_budgeted(
+                src, budget, cancel_token, fields, parse_types, defines, jobs, timings)
+        elif jobs != 1:
+            functions, macros, variables = parse_file_parallel(src, cancel_token, fields, parse_types, jobs, defines)
+        else:
+            functions, macros, variables = parse_file(src, cancel_token, fields, parse_types, defines=defines,
+                                                      timings=timings)
 
         # Check if cancelled
         if cancel_token and cancel_token.is_cancelled():
             print("⚠️  Operation cancelled by user", file=sys.stderr)
             return False
+
+        # Only complete results are cached: a budget fallback depends on the machine's speed
+        if cache_key is not None and cached is None and status == "ok":
+            cache.put(cache_key, cache_payload(functions, macros, variables))
+        if resolve:
+            macros = resolve_macros(macros, macro_resolver)
     except Exception as e:
         print(f"❌ Error parsing {file_path}: {e}", file=sys.stderr)
         return False
 
-    # Filter based on parse_types
-    if 'all' not in parse_types:
-        if 'functions' not in parse_types:
-            functions = []
-        if 'macros' not in parse_types:
-            macros = []
-        if 'variables' not in parse_types:
-            variables = []
+    if report is not None:
+        report.append({"file": str(file_path), "status": status, "timings": timings})
+    if status == "timeout":
+        print(f"❌ {file_path}: parsing exceeded the {budget:g}s budget, file skipped", file=sys.stderr)
+        return False
+    if status == "fallback":
+        print(f"⚠️  {file_path}: parsing exceeded the {budget:g}s budget; "
+              f"only {', '.join(FALLBACK_FIELDS)} are filled for its functions", file=sys.stderr)
 
     log_verbose(f"Parsed {len(functions)} functions, {len(macros)} macros, {len(variables)} variables", verbose)
+    if results is not None:
+        results[str(file_path)] = {
+            "functions": [r.as_dict() for r in functions],
+            "macros": [r.as_dict() for r in macros],
+            "variables": [r.as_dict() for r in variables]
+        }
 
     # Common field selections
-    function_fields = ["Line Number","Name","Description","Syntax","Triggers","In-Parameters","Out-Parameters",
-                      "Return Value","Function Type","Inputs","Outputs",
-                      "Invoked Operations","Used Data Types","Sync/Async","Reentrancy"]
-    macro_fields = ["Line Number", "Name", "Value"]
+    function_fields = [f for f in FUNCTION_FIELDS if fields is None or f in fields]
+    macro_fields = ["Line Number", "Name", "Value"] + (["Resolved Value"] if resolve else [])
     variable_fields = ["Line Number", "Name", "Data Type", "Initial Value", "Scope"]
 
     # Export to each requested format
@@ -1717,6 +2879,7 @@ def process_file_cli(file_path, parse_types, output_path, output_formats, verbos
     # Use tqdm for progress if available and verbose
     format_iterator = tqdm(output_formats, desc="Exporting", disable=not (verbose and TQDM_AVAILABLE)) if TQDM_AVAILABLE else output_formats
 
+    stage_start = time.perf_counter()
     for output_format in format_iterator:
         # Determine output path for this format
         if output_path:
@@ -1770,9 +2933,9 @@ def process_file_cli(file_path, parse_types, output_path, output_formats, verbos
             elif output_format == 'json':
                 log_verbose(f"Exporting to JSON: {format_output_path}", verbose)
                 output = {
-                    "functions": functions,
-                    "macros": macros,
-                    "variables": variables
+                    "functions": [r.as_dict() for r in functions],
+                    "macros": [r.as_dict() for r in macros],
+                    "variables": [r.as_dict() for r in variables]
                 }
                 with open(format_output_path, 'w', encoding='utf-8') as f:
                     json.dump(output, f, indent=2)
@@ -1783,11 +2946,176 @@ def process_file_cli(file_path, parse_types, output_path, output_formats, verbos
             print(f"❌ Error exporting to {output_format}: {e}", file=sys.stderr)
             all_success = False
 
+    timings["export"] = time.perf_counter() - stage_start
     return all_success
 
 
-def process_directory_cli(dir_path, parse_types, output_path, output_formats, file_pattern, recursive, verbose=False):
-    """Process all matching files in a directory"""
+def print_budget_summary(report, budget):
+    """Summary of a budgeted run: the files that hit the budget, with the time of each stage"""
+    over = [entry for entry in report if entry["status"] != "ok"]
+    print(f"[SUMMARY] {len(report) - len(over)}/{len(report)} files parsed within the {budget:g}s budget",
+          file=sys.stderr)
+    for entry in over:
+        stages = ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in entry["timings"].items())
+        print(f"[SUMMARY] {entry['status']}: {entry['file']} ({stages})", file=sys.stderr)
+
+
+# Parser release recorded in every cache key
+PARSER_VERSION = "3.3.0"
+
+
+def parser_fingerprint() -> str:
+    """
+    PARSER_VERSION plus a digest of the parsing modules' sources, so cache entries made by
+    an earlier build of the parser are never read back, released or not.
+    """
+    digest = hashlib.sha256(PARSER_VERSION.encode())
+    for module in (__name__, "preprocessor", "source_reader"):
+        try:
+            with open(sys.modules[module].__file__, "rb") as f:
+                digest.update(f.read())
+        except (OSError, AttributeError, TypeError):
+            pass  # frozen builds: the release alone
+    return f"{PARSER_VERSION}+{digest.hexdigest()[:16]}"
+
+
+def open_parse_cache(cache_dir, max_mb=None, verbose=False):
+    """ParseCache in cache_dir for this parser build, or None (with an error) if it cannot be opened."""
+    try:
+        cache = ParseCache(cache_dir, parser_fingerprint(), max_mb or DEFAULT_MAX_MB)
+    except Exception as e:
+        print(f"❌ Error opening parse cache in {cache_dir}: {e}", file=sys.stderr)
+        return None
+    log_verbose(f"Parse cache: {cache.path} ({cache.size / 1048576:.1f} MB)", verbose)
+    return cache
+
+
+def cache_payload(functions, macros, variables) -> list:
+    """Parse results as the plain lists a ParseCache stores."""
+    return [[r.as_dict() for r in records] for records in (functions, macros, variables)]
+
+
+def cached_records(payload) -> tuple[list, list, list]:
+    """Records back from a cache_payload."""
+    functions, macros, variables = payload
+    return ([FunctionInfo(**r) for r in functions], [MacroInfo(**r) for r in macros],
+            [VariableInfo(**r) for r in variables])
+
+
+def print_cache_stats(cache):
+    """Hit rate of this run and of the cache's lifetime, and how full the cache is"""
+    stats = cache.stats()
+    lookups = stats["hits"] + stats["misses"]
+    lifetime = stats["lifetime_hits"] + stats["lifetime_misses"]
+    print(f"[CACHE] {stats['hits']}/{lookups} files from the cache "
+          f"({100 * stats['hits'] / max(1, lookups):.1f}% hit rate), {stats['stores']} stored, "
+          f"{stats['evictions']} evicted", file=sys.stderr)
+    print(f"[CACHE] {stats['entries']} entries, {stats['size'] / 1048576:.1f} of "
+          f"{stats['max_size'] / 1048576:.1f} MB; lifetime hit rate "
+          f"{100 * stats['lifetime_hits'] / max(1, lifetime):.1f}% over {lifetime} lookups", file=sys.stderr)
+
+
+# Written next to the documents of a --since directory run: the records of every file, so a
+# run that only parses the files changed since a commit still covers the whole project.
+# It has one section per input directory, so directories sharing an output keep their records
+PROJECT_AGGREGATE = "project_documentation.json"
+
+
+def git_changed_files(directory, ref) -> set:
+    """
+    Resolved paths of the .c/.h files of directory's git work tree that differ from commit
+    ref: changed by later commits, modified in the work tree, new and untracked, or deleted.
+    None (with an error) if git cannot tell.
+    """
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=directory, capture_output=True, check=True,
+                              encoding="utf-8", errors="surrogateescape").stdout
+
+    try:
+        top = Path(git("rev-parse", "--show-toplevel").strip())
+        try:
+            git("rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}")
+        except subprocess.CalledProcessError:
+            print(f"❌ Error: '{ref}' is not a commit of the repository at {top}", file=sys.stderr)
+            return None
+        # Refresh the index stat data first, or files only touched would count as modified
+        subprocess.run(["git", "update-index", "-q", "--refresh"], cwd=directory, capture_output=True)
+        names = git("diff-index", "--name-only", "-z", "--no-renames", ref, "--", "*.c", "*.h").split("\0")
+        names += git("ls-files", "-z", "--full-name", "--others", "--exclude-standard",
+                     "--", "*.c", "*.h").split("\0")
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Error listing files changed since {ref}: {e.stderr.strip()}", file=sys.stderr)
+        return None
+    except OSError as e:
+        print(f"❌ Error running git: {e}", file=sys.stderr)
+        return None
+    return {(top / name).resolve() for name in names if name}
+
+
+def file_changed_since(file_path, since, verbose=False):
+    """True if file_path differs from commit since, False if not, None if git cannot tell."""
+    changed = git_changed_files(Path(file_path).resolve().parent, since)
+    if changed is None:
+        return None
+    if Path(file_path).resolve() in changed:
+        return True
+    log_verbose(f"Unchanged since {since}, skipped: {file_path}", verbose)
+    return False
+
+
+def read_project_aggregate(aggregate_path) -> dict:
+    """The sections of a PROJECT_AGGREGATE by input directory, {} if there is none."""
+    try:
+        with open(aggregate_path, 'r', encoding='utf-8') as f:
+            aggregate = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    sections = aggregate.get("directories") if isinstance(aggregate, dict) else None
+    return sections if isinstance(sections, dict) else {}
+
+
+def aggregate_section(aggregate_path, directory) -> str:
+    """Section name of directory in a PROJECT_AGGREGATE: its path relative to the aggregate."""
+    return Path(os.path.relpath(Path(directory).resolve(), Path(aggregate_path).parent.resolve())).as_posix()
+
+
+def load_project_aggregate(aggregate_path, section, options):
+    """
+    The per-file entries ({sha256, functions, macros, variables}) of section in a
+    PROJECT_AGGREGATE made with the same options, else None.
+    """
+    entry = read_project_aggregate(aggregate_path).get(section)
+    if not isinstance(entry, dict) or entry.get("options") != options:
+        return None
+    files = entry.get("files")
+    return files if isinstance(files, dict) else None
+
+
+def save_project_aggregate(aggregate_path, section, entry):
+    """Replace section of the PROJECT_AGGREGATE at aggregate_path, keeping the other sections."""
+    sections = read_project_aggregate(aggregate_path)
+    sections[section] = entry
+    Path(aggregate_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(aggregate_path, 'w', encoding='utf-8') as f:
+        json.dump({"directories": dict(sorted(sections.items()))}, f, indent=2)
+
+
+def project_macro_resolver(paths, defines=None) -> MacroResolver:
+    """MacroResolver over the macros of every file in paths, so values can chain across files."""
+    def macros_of(path):
+        if defines is None:
+            return iter_macros_path(path)
+        return iter_macros(blank_inactive(read_source(path), defines))
+    return MacroResolver(m for path in paths for m in macros_of(path))
+
+def process_directory_cli(dir_path, parse_types, output_path, output_formats, file_pattern, recursive, verbose=False,
+                          fields=None, jobs=1, defines=None, resolve=False, budget=None, report=None,
+                          cache=None, since=None):
+    """
+    Process all matching files in a directory (report: see process_file_cli; summarized here if not given).
+    With since, a commit, only the files changed since then are processed, and the records of
+    every file are kept in a PROJECT_AGGREGATE next to the documents
+    """
     log_verbose(f"Scanning directory: {dir_path} (recursive={recursive})", verbose)
 
     path = Path(dir_path)
@@ -1798,6 +3126,57 @@ def process_directory_cli(dir_path, parse_types, output_path, output_formats, fi
 
     log_verbose(f"Found {len(pattern_files)} files matching pattern '{file_pattern}'", verbose)
 
+    # Resolve macros across the whole directory: its headers hold most of the base values
+    macro_resolver = None
+    if resolve:
+        headers = path.rglob("*.h") if recursive else path.glob("*.h")
+        project_files = sorted(set(pattern_files).union(headers))
+        try:
+            macro_resolver = project_macro_resolver(project_files, defines)
+        except Exception as e:
+            print(f"❌ Error collecting macros under {dir_path}: {e}", file=sys.stderr)
+            return False
+        log_verbose(f"Resolved macros across {len(project_files)} files", verbose)
+
+    # --since: files unchanged since that commit keep their records from the last run's aggregate,
+    # as long as they still hold the content those records were made from
+    aggregate = results = None
+    if since:
+        changed = git_changed_files(path, since)
+        if changed is None:
+            return False
+        options = {"parse": sorted(parse_types), "defines": defines, "resolve": resolve,
+                   "fields": None if fields is None else sorted(fields)}
+        if resolve:
+            # resolved values come from the macros of every project file, so any edit invalidates them all
+            options["macro_sources"] = hashlib.sha256(
+                "".join(file_digest(p) for p in project_files).encode()).hexdigest()
+        options = json.loads(json.dumps(options))
+        aggregate_path = Path(output_path or path) / PROJECT_AGGREGATE
+        section = aggregate_section(aggregate_path, path)
+        previous = load_project_aggregate(aggregate_path, section, options)
+
+        current = {}
+        for file_path in pattern_files:
+            try:
+                digest = file_digest(file_path)
+            except OSError:
+                digest = None  # reported when the file is processed
+            current[file_path.relative_to(path).as_posix()] = (file_path, digest)
+        if previous is None:
+            log_verbose(f"No reusable records for {dir_path} in {aggregate_path}: processing every file",
+                        verbose)
+            aggregate = {}
+        else:
+            aggregate = {name: entry for name, entry in previous.items()
+                         if name in current and current[name][0].resolve() not in changed
+                         and current[name][1] is not None and entry.get("sha256") == current[name][1]}
+            pattern_files = [file_path for name, (file_path, _) in current.items() if name not in aggregate]
+            log_verbose(f"{len(pattern_files)} of {len(current)} files changed since {since} "
+                        f"or since the last run", verbose)
+        results = {}
+
+    file_report = [] if report is None else report
     success_count = 0
     for file_path in pattern_files:
         # Generate unique output path for each file
@@ -1812,10 +3191,26 @@ def process_directory_cli(dir_path, parse_types, output_path, output_formats, fi
         # Ensure output directory exists
         out_file.mkdir(parents=True, exist_ok=True)
 
-        if process_file_cli(str(file_path), parse_types, str(out_file), output_formats, verbose):
+        if process_file_cli(str(file_path), parse_types, str(out_file), output_formats, verbose,
+                            fields=fields, jobs=jobs, defines=defines, resolve=resolve,
+                            macro_resolver=macro_resolver, budget=budget, report=file_report,
+                            cache=cache, results=results):
             success_count += 1
+            if aggregate is not None:
+                name = file_path.relative_to(path).as_posix()
+                aggregate[name] = {"sha256": current[name][1], **results.pop(str(file_path))}
 
     log_verbose(f"Processed {success_count}/{len(pattern_files)} files successfully", verbose)
+    if aggregate is not None:
+        try:
+            save_project_aggregate(aggregate_path, section, {"since": since, "options": options,
+                                                             "files": dict(sorted(aggregate.items()))})
+            log_verbose(f"Updated project aggregate: {aggregate_path} ({section})", verbose)
+        except Exception as e:
+            print(f"❌ Error writing {aggregate_path}: {e}", file=sys.stderr)
+            return False
+    if budget and report is None:
+        print_budget_summary(file_report, budget)
     return success_count == len(pattern_files)
 
 
@@ -1836,6 +3231,16 @@ def process_batch_config(config_file, verbose=False):
     parse_types = config.get('parse', ['all'])
     file_pattern = config.get('file_pattern', '*.c')
     recursive = config.get('recursive', False)
+    fields = config.get('fields', None)
+    jobs = config.get('jobs', 1)
+    define_args = config.get('defines', None)
+    resolve = config.get('resolve_macros', False)
+    budget = config.get('budget', None)
+    config_headers = config.get('config_headers', [])
+    cache_dir = config.get('cache_dir', None)
+    cache_max_mb = config.get('cache_max_mb', None)
+    cache_stats = config.get('cache_stats', False)
+    since = config.get('since', None)
 
     # Parse formats (support both string and list)
     if isinstance(output_format, str):
@@ -1843,22 +3248,60 @@ def process_batch_config(config_file, verbose=False):
     else:
         output_formats = output_format
 
+    # Entity kinds (support both string and list, like format)
+    if isinstance(parse_types, str):
+        parse_types = [t.strip().lower() for t in parse_types.split(',')]
+
+    # Function fields (support both string and list, like format)
+    if isinstance(fields, str):
+        fields = [f.strip() for f in fields.split(',')]
+
+    # Defines for #if evaluation (dict or list of NAME=VALUE) and *_Cfg.h headers; none = off
+    defines = None
+    if define_args is not None or config_headers:
+        if isinstance(define_args, dict):
+            define_args = [f"{name}={value}" for name, value in define_args.items()]
+        elif isinstance(define_args, str):
+            define_args = [define_args]
+        if isinstance(config_headers, str):
+            config_headers = [config_headers]
+        defines = build_defines(define_args or [], config_headers)
+
     log_verbose(f"Batch config: {len(inputs)} inputs, format={','.join(output_formats)}", verbose)
 
+    cache = None
+    if cache_dir:
+        cache = open_parse_cache(cache_dir, cache_max_mb, verbose)
+        if cache is None:
+            return False
+
     all_success = True
+    report = []
     for input_path in inputs:
         input_path_obj = Path(input_path)
 
         if input_path_obj.is_file():
-            if not process_file_cli(input_path, parse_types, output, output_formats, verbose):
+            changed = file_changed_since(input_path, since, verbose) if since else True
+            if changed is None:
+                all_success = False
+            elif changed and not process_file_cli(input_path, parse_types, output, output_formats, verbose,
+                                                  fields=fields, jobs=jobs, defines=defines, resolve=resolve,
+                                                  budget=budget, report=report, cache=cache):
                 all_success = False
         elif input_path_obj.is_dir():
-            if not process_directory_cli(input_path, parse_types, output, output_formats, file_pattern, recursive, verbose):
+            if not process_directory_cli(input_path, parse_types, output, output_formats, file_pattern, recursive, verbose,
+                                         fields, jobs, defines, resolve, budget, report, cache, since):
                 all_success = False
         else:
             print(f"❌ Input path does not exist: {input_path}", file=sys.stderr)
             all_success = False
 
+    if budget:
+        print_budget_summary(report, budget)
+    if cache is not None:
+        if cache_stats:
+            print_cache_stats(cache)
+        cache.close()
     return all_success
 
 
@@ -1880,6 +3323,27 @@ Examples:
   # Parse directory recursively to Markdown
   python parser.py --input src/ --recursive --format markdown --parse functions,macros
 
+  # Quick inventory: only names and line numbers, skipping the body analysis
+  python parser.py --input src/ --recursive --format json --fields "Line Number,Name"
+
+  # Split a giant generated file across all CPUs
+  python parser.py --input Rte.c --format json --jobs 0
+
+  # Document only the variant selected by the configuration headers
+  python parser.py --input src/ --config-header cfg/ -D MY_FEATURE=STD_OFF
+
+  # Keep a large batch moving: at most 30 seconds of parsing per file
+  python parser.py --input src/ --recursive --budget 30
+
+  # Add resolved numeric macro values, chained across the directory's headers
+  python parser.py --input src/ --recursive --parse macros --resolve-macros
+
+  # Nightly runs: reuse the results of files unchanged since the last run
+  python parser.py --input src/ --recursive --cache-dir .docslayer_cache --cache-stats
+
+  # CI: document only the files changed since the last release tag
+  python parser.py --input src/ --recursive --format json --output docs/ --since v1.2.0
+
   # Use config file for batch processing
   python parser.py --config batch.json --verbose
 
@@ -1905,6 +3369,34 @@ Examples:
                     help="Parse directories recursively")
     ap.add_argument("--file-pattern", default="*.c",
                     help="File pattern to match (default: *.c)")
+    ap.add_argument("--fields",
+                    help="Function fields to compute and export, e.g. \"Line Number,Name,Syntax\" "
+                         "(comma-separated, default: all)")
+    ap.add_argument("--jobs", "-j", type=int, default=1,
+                    help="Worker processes for files of 1 MB and more, split at top-level "
+                         "declarations (default: 1, 0 = one per CPU)")
+    ap.add_argument("--define", "-D", action="append", default=[], metavar="NAME[=VALUE]",
+                    help="Define a macro for #if evaluation (repeatable); skips the branches it switches off")
+    ap.add_argument("--config-header", action="append", default=[], metavar="PATH",
+                    help="Take #if defines from a header, or from every *_Cfg.h under a directory (repeatable)")
+    ap.add_argument("--budget", type=float, default=None, metavar="SECONDS",
+                    help="Per-file parse time limit; a file whose per-function analysis runs over keeps "
+                         "only the discovered function fields, a file that runs over before that is skipped. "
+                         "Checked between regex matches, so one pathological match can still overrun it")
+    ap.add_argument("--resolve-macros", action="store_true",
+                    help="Add a Resolved Value field with each macro's integer value "
+                         "(across the whole directory in directory mode)")
+    ap.add_argument("--cache-dir", metavar="DIR",
+                    help="Keep parse results in a cache in DIR, keyed by file content, parser version "
+                         "and options; unchanged files are not parsed again")
+    ap.add_argument("--cache-max-mb", type=float, default=None, metavar="MB",
+                    help=f"Cache size cap; least recently used results are evicted past it "
+                         f"(default: {DEFAULT_MAX_MB})")
+    ap.add_argument("--cache-stats", action="store_true",
+                    help="Print the cache hit rate and size after the run")
+    ap.add_argument("--since", metavar="GIT_REF",
+                    help="Process only the .c/.h files changed since this commit; in directory mode the "
+                         f"records of all files are kept in {PROJECT_AGGREGATE} in the output directory")
     ap.add_argument("--verbose", "-v", action="store_true",
                     help="Enable verbose logging")
 
@@ -1916,6 +3408,33 @@ Examples:
     # Parse formats (comma-separated)
     output_formats = [f.strip().lower() for f in args.format.split(',')]
 
+    # Function fields (comma-separated, matched case-insensitively against the export labels)
+    fields = None
+    if args.fields:
+        known_fields = {f.lower(): f for f in FUNCTION_FIELDS}
+        fields = []
+        for f in args.fields.split(','):
+            if f.strip().lower() not in known_fields:
+                print(f"❌ Error: Unknown function field '{f.strip()}' (choose from: {', '.join(FUNCTION_FIELDS)})",
+                      file=sys.stderr)
+                sys.exit(1)
+            fields.append(known_fields[f.strip().lower()])
+
+    if args.budget is not None and args.budget <= 0:
+        print("❌ Error: --budget must be a positive number of seconds", file=sys.stderr)
+        sys.exit(1)
+    if args.cache_max_mb is not None and args.cache_max_mb <= 0:
+        print("❌ Error: --cache-max-mb must be a positive number", file=sys.stderr)
+        sys.exit(1)
+    if (args.cache_stats or args.cache_max_mb) and not args.cache_dir:
+        print("❌ Error: --cache-stats and --cache-max-mb need --cache-dir", file=sys.stderr)
+        sys.exit(1)
+
+    # Defines for #if evaluation; without any, every branch is parsed
+    defines = None
+    if args.define or args.config_header:
+        defines = build_defines(args.define, args.config_header)
+
     # Config file mode
     if args.config:
         success = process_batch_config(args.config, args.verbose)
@@ -1938,18 +3457,35 @@ Examples:
     # Process input
     input_path_obj = Path(input_path)
 
-    if input_path_obj.is_file():
-        success = process_file_cli(input_path, parse_types, args.output, output_formats, args.verbose)
-        sys.exit(0 if success else 1)
+    if not input_path_obj.exists():
+        print(f"❌ Error: Input path does not exist: {input_path}", file=sys.stderr)
+        sys.exit(1)
 
-    elif input_path_obj.is_dir():
-        success = process_directory_cli(input_path, parse_types, args.output, output_formats,
-                                       args.file_pattern, args.recursive, args.verbose)
-        sys.exit(0 if success else 1)
+    cache = None
+    if args.cache_dir:
+        cache = open_parse_cache(args.cache_dir, args.cache_max_mb, args.verbose)
+        if cache is None:
+            sys.exit(1)
 
+    if input_path_obj.is_file():
+        changed = file_changed_since(input_path, args.since, args.verbose) if args.since else True
+        success = changed is not None
+        if changed:
+            success = process_file_cli(input_path, parse_types, args.output, output_formats, args.verbose,
+                                       fields=fields, jobs=args.jobs, defines=defines,
+                                       resolve=args.resolve_macros, budget=args.budget, cache=cache)
     else:
-        print(f"❌ Error: Input path does not exist: {input_path}", file=sys.stderr)
-        sys.exit(1)
+        success = process_directory_cli(input_path, parse_types, args.output, output_formats,
+                                       args.file_pattern, args.recursive, args.verbose, fields, args.jobs,
+                                       defines, args.resolve_macros, args.budget, cache=cache,
+                                       since=args.since)
+
+    if cache is not None:
+        if args.cache_stats:
+            print_cache_stats(cache)
+        cache.close()
+    sys.exit(0 if success else 1)
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # worker processes of frozen builds (parse_file_parallel)
     main()
\ No newline at end of file
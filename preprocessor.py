@@ -0,0 +1,616 @@
+"""
+Preprocessor Conditionals for Documentation Slayer
+Evaluates #if/#ifdef/#elif conditions against a set of defines so disabled code can be skipped
+"""
+
+import re
+from pathlib import Path
+
+from source_reader import decode_source
+
+# Values every AUTOSAR build gets from Std_Types.h; used unless the caller overrides them
+AUTOSAR_STD_DEFINES = {"STD_ON": "1u", "STD_OFF": "0u"}
+
+# A #define with comments and continuations removed: name, parameter list (only when the
+# "(" follows the name directly, as C requires for a function-like macro), body
+DEFINE_RX = re.compile(r"#[ \t]*define[ \t]+([A-Za-z_]\w*)(\([^)]*\))?(.*)", re.DOTALL)
+
+# Code-line constructs that decide whether a block comment is left open: strings, chars, comments
+CODE_COMMENT_RX = re.compile(r""""(?:\\.|[^"\\])*"?|'(?:\\.|[^'\\])*'?|//|/\*""")
+
+# Tokens of a #if expression: numbers, identifiers, operators
+EXPR_TOKEN_RX = re.compile(r"""
+    \s*(?:
+        (0[xX][0-9A-Fa-f]+|\d+)([uUlL]*)                            # 1 integer literal, 2 suffix
+      | ([A-Za-z_]\w*)                                               # 3 identifier
+      | (&&|\|\||==|!=|<=|>=|<<|>>|[-+*/%<>&|^~!?:(),])              # 4 operator
+    )""", re.VERBOSE)
+
+# Integer literal suffixes C accepts, lowercased
+INTEGER_SUFFIXES = {"", "u", "l", "ul", "lu", "ll", "ull", "llu"}
+
+# Widths of int, long and long long for macro values: an ILP32 target, as AUTOSAR ECUs are.
+# #if arithmetic is done in intmax_t/uintmax_t instead, INTMAX_BITS wide
+C_INT_BITS = (32, 32, 64)
+INTMAX_BITS = 64
+
+# Integer types a macro body may cast to, as (bits, signed); AUTOSAR and <stdint.h> names
+CAST_TYPES = {
+    "uint8": (8, False), "uint16": (16, False), "uint32": (32, False), "uint64": (64, False),
+    "sint8": (8, True), "sint16": (16, True), "sint32": (32, True), "sint64": (64, True),
+    "uint8_t": (8, False), "uint16_t": (16, False), "uint32_t": (32, False), "uint64_t": (64, False),
+    "int8_t": (8, True), "int16_t": (16, True), "int32_t": (32, True), "int64_t": (64, True),
+    "boolean": (8, False),
+}
+
+# Names a macro body refers to; literals are matched first so nothing inside them counts
+MACRO_REFERENCE_RX = re.compile(r""""(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|\.?\d\w*|([A-Za-z_]\w*)""")
+
+# Binary operators by precedence (higher binds tighter)
+BINARY_PRECEDENCE = {
+    "||": 1, "&&": 2, "|": 3, "^": 4, "&": 5,
+    "==": 6, "!=": 6, "<": 7, ">": 7, "<=": 7, ">=": 7,
+    "<<": 8, ">>": 8, "+": 9, "-": 9, "*": 10, "/": 10, "%": 10,
+}
+
+
+class MacroEvaluator:
+    """
+    Integer evaluation of C preprocessor expressions over a set of object-like macros.
+    Each macro value is computed once and memoized; anything that is not an integer
+    constant expression (unknown names, function-like macros, cycles, signed overflow)
+    evaluates to None. Values carry their C type, so unsigned arithmetic wraps and mixed
+    comparisons convert as in C: in intmax_t/uintmax_t for #if (preprocessor=True),
+    in the types of C_INT_BITS for macro values used in code.
+    """
+
+    def __init__(self, defines: dict = None, preprocessor: bool = True):
+        self.defines = dict(defines or {})   # name -> replacement text, None = value unknown
+        self.undefined = set()               # names known not to be defined (#undef)
+        self.preprocessor = preprocessor
+        self.int_bits = INTMAX_BITS if preprocessor else C_INT_BITS[0]
+        self._values = {}
+        self._resolving = set()
+
+    def define(self, name: str, text):
+        """Record #define name text (text None: defined, but to a value we cannot know)."""
+        self.defines[name] = text
+        self.undefined.discard(name)
+        self._values.clear()
+
+    def undefine(self, name: str):
+        """Record #undef name."""
+        self.defines.pop(name, None)
+        self.undefined.add(name)
+        self._values.clear()
+
+    def forget(self, name: str):
+        """Drop what is known about name (a #define/#undef that may or may not apply)."""
+        self.defines.pop(name, None)
+        self.undefined.discard(name)
+        self._values.clear()
+
+    def is_defined(self, name: str):
+        """1 or 0 for defined(name), None if the defines do not say."""
+        if name in self.defines:
+            return 1
+        if name in self.undefined:
+            return 0
+        return None
+
+    def value(self, name: str):
+        """Integer value of macro name, or None if it has none."""
+        constant = self.constant(name)
+        return None if constant is None else constant[0]
+
+    def evaluate(self, expr: str):
+        """Integer value of a #if expression, or None if it cannot be decided."""
+        constant = self.evaluate_constant(expr)
+        return None if constant is None else constant[0]
+
+    def constant(self, name: str):
+        """(value, bits, unsigned) of macro name, or None if it has none (memoized, cycle-safe)."""
+        if name in self._values:
+            return self._values[name]
+        text = self.defines.get(name)
+        if text is None or name in self._resolving:
+            return None
+        self._resolving.add(name)
+        try:
+            result = self.evaluate_constant(text)
+        finally:
+            self._resolving.discard(name)
+        self._values[name] = result
+        return result
+
+    def evaluate_constant(self, expr: str):
+        """(value, bits, unsigned) of an integer constant expression, or None."""
+        try:
+            tokens = []
+            pos, n = 0, len(expr)
+            while pos < n:
+                m = EXPR_TOKEN_RX.match(expr, pos)
+                if not m:
+                    if expr[pos:].strip():
+                        return None
+                    break
+                if m.group(1):
+                    constant = self.literal(m.group(1), m.group(2))
+                    if constant is None:
+                        return None
+                    tokens.append(("num", constant))
+                elif m.group(3):
+                    tokens.append(("id", m.group(3)))
+                else:
+                    tokens.append(("op", m.group(4)))
+                pos = m.end()
+            if not tokens:
+                return None
+            parser = ExpressionParser(self, tokens)
+            result = parser.conditional()
+            if parser.pos != len(tokens):
+                return None
+            return result
+        except (IndexError, ValueError, RecursionError):
+            return None
+
+    def literal(self, digits: str, suffix: str):
+        """
+        (value, bits, unsigned) of an integer literal: the first type of C's list for its
+        base and suffix that holds the value, or None if none does.
+        """
+        suffix = suffix.lower()
+        if suffix not in INTEGER_SUFFIXES:
+            return None
+        octal = len(digits) > 1 and digits[0] == "0" and digits[1].isdigit()
+        value = int(digits, 8 if octal else 0)
+        unsigned = "u" in suffix
+        decimal = digits[0] != "0" or digits == "0"
+        widths = (INTMAX_BITS,) if self.preprocessor else C_INT_BITS[suffix.count("l"):]
+        for bits in widths:
+            # a decimal literal without u stays signed; hex and octal ones may turn unsigned
+            for candidate in ((True,) if unsigned else (False,) if decimal else (False, True)):
+                if value < 1 << (bits if candidate else bits - 1):
+                    return value, bits, candidate
+        return None
+
+    def truth(self, value):
+        """An int result (of !, comparisons, && and ||); None stays None."""
+        return None if value is None else (value, self.int_bits, False)
+
+    def promote(self, constant):
+        """Integer promotion: types narrower than int become int."""
+        if constant is None or constant[1] >= self.int_bits:
+            return constant
+        return constant[0], self.int_bits, False
+
+
+def convert(value: int, bits: int, unsigned: bool):
+    """
+    value in the integer type (bits, unsigned): unsigned types wrap around, and a value a
+    signed type cannot hold (signed overflow) gives None.
+    """
+    if unsigned:
+        return value & ((1 << bits) - 1), bits, True
+    if -(1 << (bits - 1)) <= value < 1 << (bits - 1):
+        return value, bits, False
+    return None
+
+
+def common_type(left, right) -> tuple:
+    """(bits, unsigned) the usual arithmetic conversions give two promoted operands."""
+    if left[1] == right[1]:
+        return left[1], left[2] or right[2]
+    # the wider type wins; a wider signed type holds every value of a narrower unsigned one
+    wider = left if left[1] > right[1] else right
+    return wider[1], wider[2]
+
+
+class ExpressionParser:
+    """
+    Precedence-climbing parser over EXPR_TOKEN_RX tokens. Values are (value, bits, unsigned)
+    constants, promoted to at least int; None propagates as "unknown".
+    """
+
+    def __init__(self, evaluator: MacroEvaluator, tokens: list):
+        self.evaluator = evaluator
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, op: str = None):
+        kind, value = self.tokens[self.pos]
+        if op is not None and (kind != "op" or value != op):
+            raise ValueError(f"expected {op}")
+        self.pos += 1
+        return kind, value
+
+    def is_cast(self) -> bool:
+        """True if the tokens after a "(" read "TYPE )" for an integer type in CAST_TYPES."""
+        if self.pos + 1 >= len(self.tokens):
+            return False
+        kind, name = self.tokens[self.pos]
+        return kind == "id" and name in CAST_TYPES and self.tokens[self.pos + 1] == ("op", ")")
+
+    def conditional(self):
+        cond = self.binary(1)
+        if self.peek() != ("op", "?"):
+            return cond
+        self.take("?")
+        then = self.conditional()
+        self.take(":")
+        other = self.conditional()
+        if then is not None and other is not None:
+            # both branches have the common type of the two
+            bits, unsigned = common_type(then, other)
+            then, other = convert(then[0], bits, unsigned), convert(other[0], bits, unsigned)
+        if cond is None:
+            return then if then == other else None
+        return then if cond[0] else other
+
+    def binary(self, min_prec: int):
+        left = self.unary()
+        while True:
+            kind, op = self.peek()
+            prec = BINARY_PRECEDENCE.get(op) if kind == "op" else None
+            if prec is None or prec < min_prec:
+                return left
+            self.take()
+            right = self.binary(prec + 1)
+            left = apply_binary(op, left, right, self.evaluator.int_bits)
+
+    def unary(self):
+        kind, value = self.take()
+        if kind == "num":
+            return self.evaluator.promote(value)
+        if kind == "op":
+            if value == "(" and self.is_cast():
+                bits, signed = CAST_TYPES[self.take()[1]]
+                self.take(")")
+                operand = self.unary()
+                if operand is None:
+                    return None
+                # conversion to a narrower signed type wraps on every target we document
+                wrapped = operand[0] & ((1 << bits) - 1)
+                if signed and wrapped >> (bits - 1):
+                    wrapped -= 1 << bits
+                return self.evaluator.promote((wrapped, bits, not signed))
+            if value == "(":
+                result = self.conditional()
+                self.take(")")
+                return result
+            if value in ("!", "-", "+", "~"):
+                operand = self.unary()
+                if operand is None:
+                    return None
+                number, bits, unsigned = operand
+                if value == "!":
+                    return self.evaluator.truth(int(not number))
+                if value == "-":
+                    return convert(-number, bits, unsigned)
+                return convert(~number, bits, unsigned) if value == "~" else operand
+            raise ValueError(f"unexpected {value}")
+
+        if value == "defined":
+            parens = self.peek() == ("op", "(")
+            if parens:
+                self.take("(")
+            kind, name = self.take()
+            if kind != "id":
+                raise ValueError("defined needs a name")
+            if parens:
+                self.take(")")
+            return self.evaluator.truth(self.evaluator.is_defined(name))
+
+        if self.peek() == ("op", "("):
+            # function-like macro call: skip its arguments, the value is unknown
+            depth = 0
+            while True:
+                _, op = self.take()
+                if op == "(":
+                    depth += 1
+                elif op == ")":
+                    depth -= 1
+                    if depth == 0:
+                        return None
+        return self.evaluator.constant(value)
+
+
+def apply_binary(op: str, left, right, int_bits: int = INTMAX_BITS):
+    """
+    C semantics for one binary operator on promoted (value, bits, unsigned) constants,
+    None meaning unknown. int_bits is the width of int, the type of truth values.
+    """
+    if op in ("&&", "||"):
+        known = [operand[0] != 0 for operand in (left, right) if operand is not None]
+        if (op == "&&" and False in known) or (op == "||" and True in known):
+            return int(op == "||"), int_bits, False
+        return None if len(known) < 2 else (int(op == "&&"), int_bits, False)
+    if left is None or right is None:
+        return None
+
+    if op in ("<<", ">>"):
+        # the result has the type of the left operand; shifting by its width or more is undefined
+        value, bits, unsigned = left
+        shift = right[0]
+        if shift < 0 or shift >= bits or (op == "<<" and value < 0):
+            return None
+        return (value >> shift, bits, unsigned) if op == ">>" else convert(value << shift, bits, unsigned)
+
+    bits, unsigned = common_type(left, right)
+    a, b = convert(left[0], bits, unsigned)[0], convert(right[0], bits, unsigned)[0]
+    if op in ("==", "!=", "<", ">", "<=", ">="):
+        result = {
+            "==": a == b, "!=": a != b, "<": a < b, ">": a > b, "<=": a <= b, ">=": a >= b,
+        }[op]
+        return int(result), int_bits, False
+    if op in ("/", "%"):
+        if b == 0:
+            return None
+        quotient = abs(a) // abs(b) * (1 if (a < 0) == (b < 0) else -1)
+        result = quotient if op == "/" else a - quotient * b
+    else:
+        result = {
+            "|": lambda x, y: x | y, "^": lambda x, y: x ^ y, "&": lambda x, y: x & y,
+            "+": lambda x, y: x + y, "-": lambda x, y: x - y, "*": lambda x, y: x * y,
+        }[op](a, b)
+    return convert(result, bits, unsigned)
+
+
+def dependency_order(graph: dict) -> list:
+    """
+    Strongly connected components of graph (name -> names it uses), dependencies first.
+    Tarjan's algorithm, run with an explicit stack so long macro chains cannot hit the
+    recursion limit. A component of more than one name, or a name using itself, is a cycle.
+    """
+    index, low = {}, {}
+    stack, on_stack = [], set()
+    components = []
+    for root in graph:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph[root]))]
+        while work:
+            name, uses = work[-1]
+            for used in uses:
+                if used not in index:
+                    index[used] = low[used] = len(index)
+                    stack.append(used)
+                    on_stack.add(used)
+                    work.append((used, iter(graph[used])))
+                    break
+                if used in on_stack:
+                    low[name] = min(low[name], index[used])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[name])
+                if low[name] == index[name]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == name:
+                            break
+                    components.append(component)
+    return components
+
+
+class MacroResolver:
+    """
+    Integer values of the macros of a file or a whole project (anything with name and value
+    fields, such as MacroInfo records). The macros form a dependency graph that is resolved
+    in dependency order, so each macro is evaluated exactly once and later references are
+    memo hits. Macros on a cycle, and names defined differently in different places, have
+    no single value and resolve to None wherever they are used.
+    """
+
+    def __init__(self, macros):
+        definitions = {}
+        conflicting = set()
+        for macro in macros:
+            known = definitions.setdefault(macro["name"], macro["value"])
+            if known != macro["value"]:
+                conflicting.add(macro["name"])
+
+        self.graph = {
+            name: [used for used in MACRO_REFERENCE_RX.findall(text) if used in definitions]
+            for name, text in definitions.items()
+        }
+        order = dependency_order(self.graph)
+        self.cyclic = {name for component in order for name in component
+                       if len(component) > 1 or name in self.graph[name]}
+
+        self.conflicting = conflicting
+        self.evaluator = MacroEvaluator(dict(AUTOSAR_STD_DEFINES, **{
+            name: None if name in self.cyclic or name in conflicting else text
+            for name, text in definitions.items()
+        }), preprocessor=False)
+        for component in order:
+            for name in component:
+                self.evaluator.value(name)
+
+    def value(self, name: str):
+        """Integer value of macro name, or None."""
+        return self.evaluator.value(name)
+
+    def resolve(self, macro):
+        """Integer value of one macro record; a conflicting name is evaluated from its own text."""
+        if macro["name"] in self.conflicting and macro["name"] not in self.cyclic:
+            return self.evaluator.evaluate(macro["value"])
+        return self.evaluator.value(macro["name"])
+
+
+def strip_directive_comments(text: str) -> str:
+    """Join continuation lines and drop comments from a directive or macro body; literals are kept as they are."""
+    text = re.sub(r"\\\r?\n", " ", text)
+    parts, pos, scan = [], 0, 0
+    while True:
+        m = CODE_COMMENT_RX.search(text, scan)
+        if not m:
+            break
+        if m.group() == "//":
+            end = text.find("\n", m.end())
+            parts.append(text[pos:m.start()])
+        elif m.group() == "/*":
+            end = text.find("*/", m.end())
+            end = end + 2 if end >= 0 else -1
+            parts.append(text[pos:m.start()] + " ")
+        else:
+            scan = m.end()  # a string or char literal: "//" and "/*" inside are text
+            continue
+        if end < 0:
+            return "".join(parts).strip()
+        pos = scan = end
+    parts.append(text[pos:])
+    return "".join(parts).strip()
+
+
+def directive_line_code(line: str, open_comment):
+    """
+    Code of one physical line of a directive, comments removed ("//" and "/*" inside a string
+    or char literal are text). open_comment is the comment still open from the previous line
+    ("/*", "//" or None).
+    Returns (code, open_comment, continued): continued is True when the directive goes on
+    to the next line, through a "\\" continuation or an unterminated block comment.
+    """
+    parts = []
+    pos = 0
+    while True:
+        if open_comment == "//":
+            # a line comment runs on only through a continuation
+            return "".join(parts), ("//" if line.endswith("\\") else None), line.endswith("\\")
+        if open_comment == "/*":
+            close = line.find("*/", pos)
+            if close < 0:
+                return "".join(parts), "/*", True
+            pos = close + 2
+            open_comment = None
+        m = CODE_COMMENT_RX.search(line, pos)
+        while m and m.group() not in ("//", "/*"):
+            m = CODE_COMMENT_RX.search(line, m.end())
+        if m:
+            parts.append(line[pos:m.start()])
+            pos = m.end()
+            open_comment = m.group()
+        else:
+            tail = line[pos:]
+            if tail.endswith("\\"):
+                parts.append(tail[:-1])
+                return "".join(parts), None, True
+            parts.append(tail)
+            return "".join(parts), None, False
+
+
+def match_define(codes: list):
+    """(name, params, body) of a directive given the code of its lines, or None if not a #define."""
+    logical = " ".join(code.strip() for code in codes)
+    m = DEFINE_RX.match(logical)
+    if not m:
+        return None
+    return m.group(1), m.group(2), m.group(3).strip()
+
+
+def code_line_opens_comment(line: str, pos: int = 0) -> bool:
+    """True if a block comment opened in this (non-directive) line is still open at its end."""
+    while True:
+        m = CODE_COMMENT_RX.search(line, pos)
+        if not m or m.group() == "//":
+            return False
+        if m.group() == "/*":
+            close = line.find("*/", m.end())
+            if close < 0:
+                return True
+            pos = close + 2
+        else:
+            pos = m.end()
+
+
+def iter_defines(lines):
+    """
+    Yield (line_number, name, params, body) for every #define in lines, any iterable of
+    text lines such as an open file. Lines are consumed one at a time: continuations are
+    joined and comments dropped as each line is read, and only the directive in progress
+    is kept. params is None for object-like macros.
+    """
+    open_comment = False   # a code block comment runs on into the next line
+    codes = None           # code of the directive being read, None outside one
+    comment = None
+    first = 0
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+        if codes is None:
+            if open_comment:
+                close = line.find("*/")
+                if close >= 0:
+                    open_comment = code_line_opens_comment(line, close + 2)
+                continue
+            if not line.lstrip(" \t").startswith("#"):
+                if "/*" in line:
+                    open_comment = code_line_opens_comment(line)
+                continue
+            codes, comment, first = [], None, number
+
+        code, comment, continued = directive_line_code(line, comment)
+        codes.append(code)
+        if continued:
+            continue
+        define = match_define(codes)
+        codes = None
+        if define:
+            yield (first,) + define
+
+    if codes:
+        define = match_define(codes)
+        if define:
+            yield (first,) + define
+
+
+def iter_defines_path(path):
+    """iter_defines over a file read in buffered binary lines, each decoded on its own."""
+    with open(path, "rb") as f:
+        yield from iter_defines(decode_source(raw) for raw in f)
+
+
+def load_config_headers(paths) -> dict:
+    """
+    Object-like #defines of configuration headers. Each path is a header file or a
+    directory, which contributes every *_Cfg.h below it.
+    """
+    defines = {}
+    for path in paths:
+        path = Path(path)
+        headers = sorted(path.rglob("*_Cfg.h")) if path.is_dir() else [path]
+        for header in headers:
+            for _, name, params, body in iter_defines_path(header):
+                if params is None:
+                    defines[name] = body
+    return defines
+
+
+def parse_define_args(args) -> dict:
+    """Defines from NAME or NAME=VALUE strings (as given to -D); a bare NAME means 1."""
+    defines = {}
+    for arg in args:
+        name, _, value = arg.partition("=")
+        if name.strip():
+            defines[name.strip()] = value.strip() if _ else "1"
+    return defines
+
+
+def build_defines(define_args=(), header_paths=()) -> dict:
+    """
+    The define set for conditional evaluation: AUTOSAR standard values, then the
+    configuration headers, then explicit NAME=VALUE arguments (later ones win).
+    """
+    defines = dict(AUTOSAR_STD_DEFINES)
+    defines.update(load_config_headers(header_paths))
+    defines.update(parse_define_args(define_args))
+    return defines
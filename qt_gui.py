@@ -35,7 +35,7 @@ class DocumentationSlayerGUI(QMainWindow):
             "Return Value", "Function Type", "Inputs", "Outputs",
             "Invoked Operations", "Used Data Types", "Sync/Async", "Reentrancy"
         ]
-        self.macro_fields = ["Line Number", "Name", "Value"]
+        self.macro_fields = ["Line Number", "Name", "Value", "Resolved Value"]
         self.variable_fields = ["Line Number", "Name", "Data Type", "Initial Value", "Scope"]
         self.formats = ["Excel", "Word", "MD"]
 
@@ -168,7 +168,7 @@ class DocumentationSlayerGUI(QMainWindow):
         self.macro_checkboxes = {}
         for i, field in enumerate(self.macro_fields):
             checkbox = QCheckBox(field)
-            checkbox.setChecked(field != "Line Number")
+            checkbox.setChecked(field not in ("Line Number", "Resolved Value"))
             self.macro_checkboxes[field] = checkbox
             grid.addWidget(checkbox, i // 3, i % 3)
 
@@ -369,7 +369,8 @@ class DocumentationSlayerGUI(QMainWindow):
             self.worker_thread = None
 
         # Create worker thread and store reference
-        self.worker_thread = ParserThread(cfile, cancel_token)
+        self.worker_thread = ParserThread(cfile, cancel_token, sel_function_fields,
+                                          "Resolved Value" in sel_macro_fields)
 
         def update_progress(text):
             progress.setLabelText(text)
@@ -420,14 +421,10 @@ class DocumentationSlayerGUI(QMainWindow):
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Export failed:\n{str(e)}")
 
-        def on_cancel():
-            cancel_token.cancel()
-            # Wait for thread to finish after cancellation
-            if self.worker_thread:
-                self.worker_thread.wait(2000)  # Wait up to 2 seconds
-
         self.worker_thread.progress.connect(update_progress)
         self.worker_thread.finished.connect(on_finished)
-        progress.canceled.connect(on_cancel)
+        # Only flag the cancel: the parser stops within milliseconds and on_finished cleans up,
+        # so the UI thread never blocks on the worker
+        progress.canceled.connect(cancel_token.cancel)
 
         self.worker_thread.start()
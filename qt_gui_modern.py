@@ -165,7 +165,7 @@ class DocumentationSlayerModernGUI(QMainWindow):
             "Function Type", "Invoked Operations", "Out-Parameters", "Return Value",
             "Outputs", "In-Parameters", "Reentrancy", "Line Number"
         ]
-        self.macro_fields = ["Name", "Value", "Line Number"]
+        self.macro_fields = ["Name", "Value", "Resolved Value", "Line Number"]
         self.variable_fields = ["Name", "Data Type", "Initial Value", "Scope", "Line Number"]
         self.formats = ["Excel", "Word", "MD"]
 
@@ -544,7 +544,7 @@ class DocumentationSlayerModernGUI(QMainWindow):
 
             toggle = ModernToggleSwitch()
             toggle.setFixedSize(50, 25)
-            toggle.setChecked(field != "Line Number")
+            toggle.setChecked(field not in ("Line Number", "Resolved Value"))
             self.macro_toggles[field] = toggle
             card_layout.addWidget(toggle)
 
@@ -1018,7 +1018,8 @@ class DocumentationSlayerModernGUI(QMainWindow):
         progress.setWindowModality(Qt.WindowModality.WindowModal)
         progress.setMinimumDuration(0)
 
-        self.worker_thread = ParserThread(cfile, cancel_token)
+        self.worker_thread = ParserThread(cfile, cancel_token, sel_function_fields,
+                                          "Resolved Value" in sel_macro_fields)
 
         def on_finished(success, error, functions, macros, variables):
             if self.worker_thread:
@@ -1062,6 +1063,8 @@ class DocumentationSlayerModernGUI(QMainWindow):
 
         self.worker_thread.progress.connect(lambda text: progress.setLabelText(text))
         self.worker_thread.finished.connect(on_finished)
-        progress.canceled.connect(lambda: (cancel_token.cancel(), self.worker_thread.wait(2000) if self.worker_thread else None))
+        # Only flag the cancel: the parser stops within milliseconds and on_finished cleans up,
+        # so the UI thread never blocks on the worker
+        progress.canceled.connect(cancel_token.cancel)
 
         self.worker_thread.start()
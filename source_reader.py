@@ -0,0 +1,74 @@
+"""
+Source Reader for Documentation Slayer
+Memory-mapped input layer shared by the parser, the GUIs and the activity diagram generator
+"""
+
+import codecs
+import io
+import mmap
+import os
+
+# Tried in order; Latin-1 maps every byte, so legacy files always decode
+SOURCE_ENCODINGS = ("utf-8", "latin-1")
+
+# Bytes of the mapping decoded per step
+READ_BLOCK = 1 << 20
+
+
+def decode_source(data) -> str:
+    """Decode a bytes-like object with the first encoding in SOURCE_ENCODINGS that fits."""
+    for encoding in SOURCE_ENCODINGS[:-1]:
+        try:
+            return str(data, encoding)
+        except UnicodeDecodeError:
+            pass
+    return str(data, SOURCE_ENCODINGS[-1])
+
+
+class SourceDecoder(codecs.IncrementalDecoder):
+    """
+    Incremental UTF-8 decoder that turns to Latin-1 at the first byte that is not UTF-8,
+    so a legacy file is decoded in one pass instead of being decoded again from the start.
+    Input is decoded in place (no bytes copy), apart from a sequence left open at its end.
+    """
+
+    def __init__(self, errors="strict"):
+        super().__init__(errors)
+        self.reset()
+
+    def decode(self, data, final=False):
+        if self.latin1:
+            return str(data, "latin-1")
+        view = memoryview(self.pending + bytes(data) if self.pending else data)
+        try:
+            text, used = codecs.utf_8_decode(view, "strict", final)
+        except UnicodeDecodeError as e:
+            bad = e.start  # the exception holds a copy of the input: let it go first
+        else:
+            self.pending = bytes(view[used:])
+            return text
+        self.latin1, self.pending = True, b""
+        return str(view[:bad], "utf-8") + str(view[bad:], "latin-1")
+
+    def reset(self):
+        self.latin1 = False
+        self.pending = b""  # start of a UTF-8 sequence the last input ended in
+
+
+def read_source(path) -> str:
+    """
+    Read a C source file as text, decoded in a single pass (see SourceDecoder) from a
+    memory map of the file. A file without '\\r' is decoded straight into the one str
+    returned. Otherwise line endings are normalized to '\\n', as text-mode open() would,
+    in the same pass, block by block.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm.find(b"\r") < 0:
+                return SourceDecoder().decode(mm, True)
+            decoder = io.IncrementalNewlineDecoder(SourceDecoder(), translate=True)
+            size = len(mm)
+            return "".join(decoder.decode(mm[pos:pos + READ_BLOCK], pos + READ_BLOCK >= size)
+                           for pos in range(0, size, READ_BLOCK))
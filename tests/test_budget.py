@@ -0,0 +1,47 @@
+"""
+A budgeted parse whose per-function analysis runs over falls back within the budget,
+without a second pass over the file
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import parser as doc_parser  # noqa: E402
+
+FUNCTION = "uint8 Swc_Fn{0}(uint8 *p)\n{{\n    *p = {0};\n    return 0;\n}}\nuint8 Swc_Var{0};\n#define SWC_M{0} {0}\n"
+SOURCE = "".join(FUNCTION.format(i) for i in range(200))
+
+
+def as_dicts(result):
+    return [[record.as_dict() for record in records] for records in result]
+
+
+def test_budget_fallback_stays_within_budget(monkeypatch):
+    classify_params, iter_variables = doc_parser.classify_params, doc_parser.iter_variables
+
+    def slow_classify_params(*args, **kwargs):
+        time.sleep(0.01)
+        return classify_params(*args, **kwargs)
+
+    def slow_iter_variables(*args, **kwargs):
+        time.sleep(0.4)  # a variable pass the fallback must not run again
+        return iter_variables(*args, **kwargs)
+
+    monkeypatch.setattr(doc_parser, "classify_params", slow_classify_params)
+    monkeypatch.setattr(doc_parser, "iter_variables", slow_iter_variables)
+    start = time.perf_counter()
+    *result, status = doc_parser.parse_file_budgeted(SOURCE, 0.5)
+    elapsed = time.perf_counter() - start
+
+    assert status == "fallback"
+    assert elapsed < 0.5 + 0.25
+    assert as_dicts(result) == as_dicts(doc_parser.parse_file(SOURCE, fields=doc_parser.FALLBACK_FIELDS))
+
+
+def test_budget_ok_matches_parse_file():
+    *result, status = doc_parser.parse_file_budgeted(SOURCE, 60)
+    assert status == "ok"
+    assert as_dicts(result) == as_dicts(doc_parser.parse_file(SOURCE))
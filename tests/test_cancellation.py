@@ -0,0 +1,55 @@
+"""
+Cancelling a parse from another thread must stop it within 100 ms,
+even inside the analysis of one huge function
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import parser as doc_parser  # noqa: E402
+
+BODY_LINE = "    *out = in[{0}] + x;\n    if (x > {0}) {{ Rte_Write_Port_Data(out); }}\n"
+HUGE_FUNCTION = ("void Swc_Huge(uint8 x, uint8 *out, const uint8 *in)\n{\n"
+                 + "".join(BODY_LINE.format(i) for i in range(20000)) + "}\n")
+
+
+def test_cancel_inside_classify_params(monkeypatch):
+    token = doc_parser.CancellationToken()
+    entered = threading.Event()
+    cancelled_at = []
+    classify_params = doc_parser.classify_params
+
+    def classify_and_signal(*args, **kwargs):
+        entered.set()
+        return classify_params(*args, **kwargs)
+
+    def cancel():
+        entered.wait()
+        time.sleep(0.05)
+        cancelled_at.append(time.perf_counter())
+        token.cancel()
+
+    monkeypatch.setattr(doc_parser, "classify_params", classify_and_signal)
+    canceller = threading.Thread(target=cancel)
+    canceller.start()
+    functions, macros, variables = doc_parser.parse_file(HUGE_FUNCTION, token)
+    returned_at = time.perf_counter()
+    canceller.join()
+
+    assert cancelled_at, "parse finished before the cancel"
+    assert functions == []
+    assert returned_at - cancelled_at[0] <= 0.1
+
+
+def test_cancel_while_lexing():
+    token = doc_parser.CancellationToken()
+    timer = threading.Timer(0.05, token.cancel)
+    timer.start()
+    start = time.perf_counter()
+    doc_parser.parse_file(HUGE_FUNCTION * 4, token)
+    timer.join()
+    assert time.perf_counter() - start <= 0.05 + 0.1
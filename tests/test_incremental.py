@@ -0,0 +1,137 @@
+"""
+Incremental and chunked parsing must give exactly what a whole-file parse_file gives,
+for valid code and for the half-typed code an editor shows between keystrokes
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import parser as doc_parser  # noqa: E402
+
+SOURCE = """/* File header comment */
+#include "Rte_Swc.h"
+#define SWC_BASE   (0x100U)   /* base */
+#define SWC_OFF    (SWC_BASE + 4U) // offset
+static uint8 Swc_ErrCnt = 0;
+extern uint32 Swc_External;
+uint8 Swc_Buffer[16] = {1, 2, 3};
+uint32 Swc_Global = 5U;
+typedef struct {
+    uint8 a;
+    uint16 b;
+} Swc_StructType;
+
+/**
+ * @brief Compute things.
+ * @param x input
+ */
+static uint8 Swc_Helper(uint8 x, uint8 *out, const uint8 *in)
+{
+    uint8 local = 0;
+    *out = x + in[0];
+    if (x > 3) { local++; }
+    return local;
+}
+
+/// Line doxygen comment
+uint8 Swc_Flag;
+uint32 Swc_GlobalFn(uint32 *val, uint8 arr[4])
+{
+    uint32 tmp;
+    tmp = *val;
+    Swc_Helper(1, &tmp, arr);
+    return tmp;
+}
+
+/* RunnableEntity trigger: TimingEvent 10ms */
+FUNC(void, Swc_CODE) Swc_Run10ms(void)
+{
+    uint8 data;
+    (void)Rte_Read_PortA_Data(&data);
+    Rte_Write_PortB_Data(data);
+    {
+        int nested = 3;
+    }
+}
+
+#define SWC_LAST 7u
+FUNC(Std_ReturnType, Swc_CODE) Swc_Init(void)
+{
+    return E_OK;
+}
+"""
+
+# Pieces of code, valid and not, typed into random places
+SNIPPETS = [
+    "\n", "x = 1;\n", "}\n", "{\n", "(", ")", ";", "/*", "*/", "\"", "// c\n", "/// doc line\n",
+    " * star;\n", "foo(a,\n", "#define FOO 3\n", "static uint8 s_new;\n", "extern int q;\n", "[", "]", " = ",
+    "uint8 half[16\n", "x = {\n", "uint8 t[2] = {1, 2}\n",
+    "/* RunnableEntity trigger: DataReceivedEvent */\n", "void NewFn(void)\n{\n  a = b;\n}\n",
+    "FUNC(void, RTE_CODE) Run_X(void)\n{\n}\n", "FUNC(void, RTE_CODE) Run_Y(", "int k;\n/// d\nint m;\n",
+]
+
+
+def as_dicts(result):
+    return [[record.as_dict() for record in records] for records in result]
+
+
+def random_edit(rng, src):
+    pos = rng.randrange(len(src) + 1)
+    if rng.random() < 0.7:
+        return src[:pos] + rng.choice(SNIPPETS) + src[pos:]
+    return src[:pos] + src[pos + rng.randrange(1, 40):]
+
+
+def test_doxygen_line_comment_above_declaration():
+    src = "uint8 a;\n/// doc\nuint8 v;\nuint16 g(uint8 x)\n{\n  return x;\n}"
+    incremental = doc_parser.IncrementalParser()
+    incremental.parse(src)
+    edited = src.replace("return x;", "return x + 1;")
+    assert as_dicts(incremental.parse(edited)) == as_dicts(doc_parser.parse_file(edited))
+
+
+@pytest.mark.parametrize("seed", range(12))
+def test_incremental_matches_whole_file_over_random_edits(seed):
+    rng = random.Random(seed)
+    incremental = doc_parser.IncrementalParser()
+    src = SOURCE
+    incremental.parse(src)
+    for _ in range(150):
+        if len(src) < len(SOURCE) // 2:
+            src = SOURCE
+        for _ in range(rng.choice([1, 1, 2, 3])):
+            src = random_edit(rng, src)
+        assert as_dicts(incremental.parse(src)) == as_dicts(doc_parser.parse_file(src)), src
+
+
+def test_array_size_across_cut_points():
+    src = "uint8 a;\nuint8 b[16;\nuint8 c;\nuint8 d];\nuint8 e;\n"
+    incremental = doc_parser.IncrementalParser()
+    incremental.parse(src.replace("b[16;", "b[16];"))
+    assert as_dicts(incremental.parse(src)) == as_dicts(doc_parser.parse_file(src))
+
+
+def test_incremental_parsers_are_capped(monkeypatch):
+    monkeypatch.setattr(doc_parser, "incremental_parsers", {})
+    first = doc_parser.incremental_parser("a.c")
+    for i in range(doc_parser.INCREMENTAL_MAX_FILES):
+        doc_parser.incremental_parser(f"{i}.c")
+    assert len(doc_parser.incremental_parsers) == doc_parser.INCREMENTAL_MAX_FILES
+    assert doc_parser.incremental_parser("a.c") is not first
+    assert doc_parser.incremental_parser("a.c") is doc_parser.incremental_parser("a.c")
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_parallel_matches_whole_file_over_random_edits(monkeypatch, seed):
+    monkeypatch.setattr(doc_parser, "PARALLEL_MIN_BYTES", 0)
+    rng = random.Random(seed)
+    for _ in range(10):
+        src = SOURCE * 3
+        for _ in range(rng.randint(1, 6)):
+            src = random_edit(rng, src)
+        assert as_dicts(doc_parser.parse_file_parallel(src, workers=2)) == as_dicts(doc_parser.parse_file(src)), src
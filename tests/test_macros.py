@@ -0,0 +1,51 @@
+"""
+"//" and "/*" inside quoted macro values are text, on the token path and on the streaming path alike
+"""
+
+import io
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import parser as doc_parser  # noqa: E402
+import preprocessor  # noqa: E402
+
+SOURCE = """#define URL "http://host"   // the host
+#define OPEN "/*"
+uint8 Swc_After;
+#define SLASH '/' /* slash */
+#define QUOTED "a\\"//b" // c
+#define MULTI(x) \\
+    ((x) + 1) /* it's */
+#if defined(URL) // don't
+uint8 Swc_Inside;
+#endif
+"""
+
+EXPECTED = [
+    ("URL", '"http://host"', 1),
+    ("OPEN", '"/*"', 2),
+    ("SLASH", "'/'", 4),
+    ("QUOTED", '"a\\"//b"', 5),
+    ("MULTI", "((x) + 1)", 6),
+]
+
+
+def macros(records):
+    return [(m.name, m.value, m.lineNumber) for m in records]
+
+
+def test_comment_markers_in_quoted_values():
+    assert macros(doc_parser.iter_macros(SOURCE)) == EXPECTED
+    assert macros(doc_parser.iter_macros_stream(io.StringIO(SOURCE))) == EXPECTED
+
+
+def test_open_comment_marker_in_string_hides_nothing():
+    functions, macros_, variables = doc_parser.parse_file(SOURCE)
+    assert [v.name for v in variables] == ["Swc_After", "Swc_Inside"]
+
+
+def test_strip_directive_comments_keeps_literals():
+    assert preprocessor.strip_directive_comments('X "a//b" /* c */ + 1 // d') == 'X "a//b"   + 1'
+    assert doc_parser.blank_inactive(SOURCE, {"URL": '"x"'}) == SOURCE
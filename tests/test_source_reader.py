@@ -0,0 +1,35 @@
+"""
+read_source must decode like text-mode open(), with Latin-1 from the first byte that is not UTF-8,
+wherever the blocks of the decoder happen to split the file
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import source_reader  # noqa: E402
+
+CASES = [
+    ("int a;\nint b;\n".encode(), "int a;\nint b;\n"),
+    ("/* é € 𝄞 */\r\nint a;\rint b;\r\n".encode(), "/* é € 𝄞 */\nint a;\nint b;\n"),
+    ("/* é */\n".encode() + b"int a; /* \xe9t\xe9 */\r\n/* \xff */\r", "/* é */\nint a; /* \xe9t\xe9 */\n/* \xff */\n"),
+    (b"int a;\xc3", "int a;\xc3"),
+]
+
+
+@pytest.mark.parametrize("block", [1, 2, 3, 7, 1 << 20])
+@pytest.mark.parametrize("data, text", CASES)
+def test_read_source(tmp_path, monkeypatch, data, text, block):
+    monkeypatch.setattr(source_reader, "READ_BLOCK", block)
+    path = tmp_path / "src.c"
+    path.write_bytes(data)
+    assert source_reader.read_source(path) == text
+
+
+def test_read_empty_source(tmp_path):
+    path = tmp_path / "empty.c"
+    path.write_bytes(b"")
+    assert source_reader.read_source(path) == ""